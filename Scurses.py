@@ -3,27 +3,275 @@
 
 from __future__ import annotations
 
-import curses, curses.ascii, curses.textpad
-from utils import *; logstart('Scurses')
+import abc, bisect, collections, collections.abc, contextlib, curses, curses.ascii, functools, heapq, os, re, string, struct, sys, threading, time, types, weakref
 
 MOUSE_WHEEL = (curses.BUTTON4_PRESSED | +2097152) #curses.REPORT_MOUSE_POSITION |
 
+# The views only need `utils'-style annotation defaults, which are provided here,
+# so that the whole `utils' toolkit is imported only once one of its helpers is used.
+
+def _utils():
+	""" Return the `utils' module, importing it and starting the log on first use. """
+
+	global utils
+	if ('utils' not in globals()):
+		import utils
+		utils.logstart('Scurses')
+	return utils
+
+@functools.cache
+def _typeDefaults(cls) -> tuple[tuple[str, callable]]:
+	""" Return `(name, factory)' for the annotated attributes of `cls' that have no class-level value:
+		`x: int', `x: list[int]' -- the type (or its origin) is called;
+		`x: lambda: ...' -- the lambda is called;
+		`x: 8' -- the value itself;
+		`x: '# ...'' and unions -- documentation only.
+	"""
+
+	defaults = dict()
+	for c in reversed(cls.__mro__):
+		module = sys.modules.get(c.__module__)
+		for k, v in c.__dict__.get('__annotations__', {}).items():
+			if (isinstance(v, str)):
+				if (v.startswith('#')): continue
+				try: v = eval(v, (vars(module) if (module is not None) else {}))
+				except Exception: continue
+			if (isinstance(v, types.UnionType)): defaults.pop(k, None)
+			elif (isinstance(v, (type, types.GenericAlias))): defaults[k] = getattr(v, '__origin__', v)
+			elif (callable(v)): defaults[k] = v
+			else: defaults[k] = (lambda v=v: v)
+
+	return tuple((k, v) for k, v in defaults.items() if not any(k in c.__dict__ for c in cls.__mro__[:-1]))
+
+class TypeInit:
+	""" Initializes instance attributes from the class annotations (see `_typeDefaults()'). """
+
+	__slots__ = ()
+
+	def __new__(cls, *args, **kwargs):
+		self = super().__new__(cls)
+		for k, v in _typeDefaults(cls): setattr(self, k, v())
+		return self
+
+class ABCTypeInit(TypeInit, metaclass=abc.ABCMeta):
+	__slots__ = ()
+
+class _SlotsMeta(type):
+	def __new__(metacls, name, bases, classdict):
+		classdict.setdefault('__slots__', tuple(k for k in classdict.get('__annotations__', ()) if k not in classdict))
+		return super().__new__(metacls, name, bases, classdict)
+
+class Slots(TypeInit, metaclass=_SlotsMeta):
+	""" `TypeInit' with `__slots__' made of the annotated attributes that have no class-level value. """
+
+	__slots__ = ()
+
+class SCFenwickTree(Slots):
+	""" List of non-negative ints with O(log n) point updates, prefix sums and position lookups.
+	Inserting or removing an item in the middle is O(n).
+	"""
+
+	# public:
+	values: list[int]
+
+	# private:
+	tree: list[int]
+
+	# properties:
+	total: int
+
+	def __init__(self, values=()):
+		self.values = list(values)
+		self.rebuild()
+
+	def __len__(self):
+		return len(self.values)
+
+	def __getitem__(self, i):
+		return self.values[i]
+
+	def __setitem__(self, i, x):
+		self.add(i, x - self.values[i])
+
+	def rebuild(self):
+		tree = [0, *self.values]
+		for i in range(1, len(tree)):
+			j = (i + (i & -i))
+			if (j < len(tree)): tree[j] += tree[i]
+		self.tree = tree
+
+	def add(self, i, delta):
+		self.values[i] += delta
+		tree = self.tree
+		i = (i % len(self.values) + 1)
+		while (i < len(tree)):
+			tree[i] += delta
+			i += (i & -i)
+
+	def append(self, x):
+		self.values.append(x)
+		tree = self.tree
+		i = len(tree)
+		j, stop = i-1, (i - (i & -i))
+		while (j > stop):
+			x += tree[j]
+			j -= (j & -j)
+		tree.append(x)
+
+	def insert(self, i, x):
+		self.values.insert(i, x)
+		self.rebuild()
+
+	def pop(self, i=-1):
+		r = self.values.pop(i)
+		self.rebuild()
+		return r
+
+	def prefix(self, i) -> int:
+		""" Sum of the first `i' values. """
+
+		tree = self.tree
+		r = int()
+		while (i > 0):
+			r += tree[i]
+			i -= (i & -i)
+		return r
+
+	def find(self, v) -> (int -- i, int -- offset):
+		""" Find the item spanning position `v', i.e. such `i' that `.prefix(i) <= v < .prefix(i+1)'.
+		Return: (i, offset)
+			i: item index (`len(self)' if `v >= .total').
+			offset: `v - .prefix(i)'.
+		"""
+
+		tree = self.tree
+		i, step = 0, (1 << (len(tree)-1).bit_length())
+		while (step):
+			j = (i + step)
+			if (j < len(tree) and tree[j] <= v):
+				i = j
+				v -= tree[j]
+			step >>= 1
+		return (i, v)
+
+	@property
+	def total(self) -> int:
+		return self.prefix(len(self.values))
+
+class SCIntervalSet(Slots):
+	""" Set of ints stored as sorted disjoint runs `[starts[k], stops[k])'.
+	Adding or removing a range of any length is O(log k + m) for k runs, m of them touched; membership is O(log k).
+	"""
+
+	# public:
+	starts: list[int]
+	stops: list[int]
+
+	# properties:
+	count: int
+
+	def __init__(self, runs=()):
+		self.starts, self.stops = list(), list()
+		for start, stop in runs: self.add(start, stop)
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({list(self.runs())!r})"
+
+	def __contains__(self, i):
+		k = (bisect.bisect_right(self.starts, i) - 1)
+		return (k >= 0 and i < self.stops[k])
+
+	def __bool__(self):
+		return bool(self.starts)
+
+	def __iter__(self):
+		for start, stop in self.runs(): yield from range(start, stop)
+
+	def runs(self):
+		return zip(self.starts, self.stops)
+
+	def clear(self):
+		self.starts.clear()
+		self.stops.clear()
+
+	def add(self, start, stop=None):
+		""" Add `[start, stop)', or just `start' if `stop' is None. """
+
+		if (stop is None): stop = start+1
+		if (start >= stop): return
+		i = bisect.bisect_left(self.stops, start)
+		j = bisect.bisect_right(self.starts, stop)
+		if (i < j): start, stop = min(start, self.starts[i]), max(stop, self.stops[j-1])
+		self.starts[i:j], self.stops[i:j] = [start], [stop]
+
+	def discard(self, start, stop=None):
+		""" Remove `[start, stop)', or just `start' if `stop' is None. """
+
+		if (stop is None): stop = start+1
+		if (start >= stop): return
+		i = bisect.bisect_right(self.stops, start)
+		j = bisect.bisect_left(self.starts, stop)
+		if (i >= j): return
+		starts, stops = list(), list()
+		if (self.starts[i] < start): starts.append(self.starts[i]); stops.append(start)
+		if (self.stops[j-1] > stop): starts.append(stop); stops.append(self.stops[j-1])
+		self.starts[i:j], self.stops[i:j] = starts, stops
+
+	def toggle(self, start, stop=None):
+		""" Invert membership of every item in `[start, stop)', or just `start' if `stop' is None. """
+
+		if (stop is None): stop = start+1
+		if (start >= stop): return
+		i = bisect.bisect_right(self.stops, start)
+		j = bisect.bisect_left(self.starts, stop)
+		gaps, p = list(), start
+		for k in range(i, j):
+			if (self.starts[k] > p): gaps.append((p, self.starts[k]))
+			p = self.stops[k]
+		if (p < stop): gaps.append((p, stop))
+		self.discard(start, stop)
+		for a, b in gaps: self.add(a, b)
+
+	def shift(self, start, stop, delta):
+		""" Follow a sequence change replacing items `[start, stop)' by `stop-start+delta' new (unselected) ones. """
+
+		self.discard(start, stop)
+		if (not delta): return
+
+		starts, stops = self.starts, self.stops
+		k = bisect.bisect_left(starts, stop)
+		if (k and stops[k-1] > stop):  # insertion inside a run
+			starts.insert(k, stop)
+			stops.insert(k-1, stop)
+		for i in range(k, len(starts)):
+			starts[i] += delta
+			stops[i] += delta
+		if (0 < k < len(starts) and stops[k-1] >= starts[k]):
+			del starts[k], stops[k-1]
+
+	@property
+	def count(self) -> int:
+		return sum(stop - start for start, stop in self.runs())
+
 class SCWindow(TypeInit):
 	# public:
 	stdscr: '# curses.window'
-	app: '# SCApp'
 	key_handlers: dict[callable]
 	views: list[SCView]
 	inited: bool
 	died: bool
 
 	# private:
+	appref: weakref.ref | None = None
+	ownerref: weakref.ref | None = None
 	waitrelease: '# SCKey | None'
 	waitrelease_pressed: bool
 	waitrelease_lastpressed: int
 	debugstr: str
 
 	# properties:
+	app: SCApp
+	owner: SCView
 	top: SCView
 	touched: bool
 
@@ -31,14 +279,17 @@ class SCWindow(TypeInit):
 		self.stdscr, self.app = stdscr, app
 		self.waitrelease = None
 
-	def __del__(self):
-		try: self.die()
-		except AttributeError: pass
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.die()
 
 	def init(self):
 		self.stdscr.nodelay(True)
 
 		for view in self.views:
+			view.app = (self.app or self)  # added before this window got its app
 			view.init()
 
 		self.inited = True
@@ -47,25 +298,31 @@ class SCWindow(TypeInit):
 	def die(self) -> bool -- ret:
 		if (self.died): return True  # exactly in that order
 		self.died = True
-		for view in self.views:
+		for view in self.views[::-1]:
 			view.die()
+		self.views.clear()
 
-	def addView(self, view: SCView):
+	def addView(self, view: SCView) -> SCView:
 		view.app = (self.app or self)
+		view.parent = self
 		self.views.append(view)
 		if (self.inited): view.init()
+		return view
 
-	def popView(self):
-		self.top.die()
+	def popView(self) -> SCView:
+		view = self.top
 		del self.top
+		view.die()
 		self.touch()
+		return view
 
 	def debugOut(self, *s, sep=' '):
-		if (s): self.debugstr = S(sep.join(map(str, s))).wrap(self.stdscr.getmaxyx()[1]//2).split('\n')
+		if (s): self.debugstr = _utils().S(sep.join(map(str, s))).wrap(self.stdscr.getmaxyx()[1]//2).split('\n')
 		else: self.debugstr = ''
 
 	def proc(self) -> bool -- ret:
-		""" Process before `.draw()', e.g. check some condition to call `.touch()'.
+		""" Process before `.draw()': remove died views and touch the ones under touched transparent views.
+		Called by `SCApp.proc()' after a view of this window was touched or died.
 		You should not use `.stdscr' here.
 		You may use `.touched' meant for the upcoming frame here.
 		Return: (ret)
@@ -80,7 +337,6 @@ class SCWindow(TypeInit):
 				else: touch_next = True
 				continue
 			if (touch_next): view.touch()
-			view.proc()
 			touch_next = (view.transparent and view.touched)
 
 	def draw(self) -> bool -- ret:
@@ -134,6 +390,29 @@ class SCWindow(TypeInit):
 		self.draw()
 		self.stdscr.noutrefresh(*rargs)
 
+	def newpad(self, nlines: int, ncols: int):
+		""" Create a pad for a child window (see `curses.newpad()'). """
+
+		return (self.app.newpad(nlines, ncols) if (self.app is not None) else curses.newpad(nlines, ncols))
+
+	@property
+	def app(self) -> SCApp | None:
+		return (self.appref() if (self.appref is not None) else None)
+
+	@app.setter
+	def app(self, app: SCApp | None):
+		self.appref = (weakref.ref(app) if (app is not None) else None)
+
+	@property
+	def owner(self) -> SCView | None:
+		""" View this window is drawn by, if any. """
+
+		return (self.ownerref() if (self.ownerref is not None) else None)
+
+	@owner.setter
+	def owner(self, owner: SCView | None):
+		self.ownerref = (weakref.ref(owner) if (owner is not None) else None)
+
 	@property
 	def top(self) -> SCView:
 		return self.views[-1]
@@ -151,79 +430,1290 @@ class SCWindow(TypeInit):
 class SCApp(SCWindow):
 	# public:
 	frame_delay: float
-	proc_delay: int
+	proc_delay: float; 'seconds between passes of the main loop while there are polling views'
 	esc_delay: int
 	mouse_delay: int
 	mouse_mask: int
+	output: SCTermWriter | None = None; 'output backend, `None\' means curses'
+	render_cache: SCLRUCache | None = None; 'item texts, may be shared between apps'
+	recorder: SCRecorder | None = None
 
 	# private:
 	lastframe: int
+	inscr: curses.window | None = None
+	timers: list; 'heap of [when, seq, weakref to target, interval]'
+	timer_seq: int
+	wakeups: dict; 'targets to `.proc()\' on the next pass, in order'
+	wakeup_lock: lambda: threading.Lock()
+	pollers: weakref.WeakSet; 'views proc\'d on every pass (`.poll\')'
+	wake_fds: tuple[int, int] | None = None; 'pipe interrupting the main loop\'s wait for input'
+	loop_thread: int | None = None
+	color_epoch: int; '`SCStyle.pairs.epoch\' of the last frame'
+
+	def __init__(self, *args, frame_rate=60, proc_rate=60, esc_delay=25, mouse_delay=None, mouse_mask=None, output='curses', record=None, **kwargs):
+		""" `output' is either 'curses' (default), 'term' for `SCTermWriter()', or an `SCTermWriter' instance.
+		`record' is a file name to record input and frame stats to (see `SCReplay').
+		"""
 
-	def __init__(self, *args, frame_rate=60, proc_rate=60, esc_delay=25, mouse_delay=None, mouse_mask=None, **kwargs):
 		super().__init__(*args, **kwargs)
 		self.frame_delay = 1/frame_rate
-		self.proc_delay = int(10//proc_rate)
+		self.proc_delay = 1/proc_rate
 		self.esc_delay = esc_delay
 		self.mouse_delay = self.mouse_delay
 		self.mouse_mask = self.mouse_mask
+		if (output == 'curses'): output = None
+		elif (output == 'term'): output = SCTermWriter()
+		self.output = output
+		if (record is not None): self.recorder = SCRecorder(record)
 
 	def init(self):
 		super().init()
-		if (self.proc_delay > 0): curses.halfdelay(self.proc_delay)
+		if (self.inscr is None): return  # not on a curses terminal
+		if (SCStyle.pairs.virtual): SCStyle.pairs.reset()
+		self.color_epoch = SCStyle.pairs.epoch
 		if (self.esc_delay > 0): curses.set_escdelay(self.esc_delay)
 		if (self.mouse_delay is not None): curses.mouseinterval(self.mouse_delay)
 		if (self.mouse_mask is not None): curses.mousemask(self.mouse_mask)
 
 	def quit(self):
+		for view in self.views[::-1]:
+			view.die()
 		self.views.clear()
 
+	def proc(self) -> bool -- ret:
+		""" Run due timers, then `.proc()' every woken up window or view and every polling view. """
+
+		timers, now = self.timers, time.monotonic()
+		while (timers and timers[0][0] <= now):
+			timer = heapq.heappop(timers)
+			target = (timer[2]() if (timer[2] is not None) else None)
+			if (target is None or target.died): continue
+			if (timer[3] is not None):
+				timer[0] = max(timer[0] + timer[3], now)
+				heapq.heappush(timers, timer)
+			self.wakeup(target)
+
+		for view in list(self.pollers):
+			if (not view.died): view.proc()
+
+		with self.wakeup_lock:
+			wakeups, self.wakeups = self.wakeups, dict()
+		for target in wakeups:
+			if (target is not self and not target.died): target.proc()
+
+		if (self.color_epoch != SCStyle.pairs.epoch):  # styles drawn with reassigned pairs
+			self.color_epoch = SCStyle.pairs.epoch
+			self.touchAll()
+
+		return super().proc()
+
+	def wakeup(self, target: SCView | SCWindow):
+		""" Call `target.proc()' on the next pass of the main loop. Safe to call from other threads. """
+
+		with self.wakeup_lock:
+			idle = (not self.wakeups)
+			self.wakeups[target] = None
+
+		if (idle and self.wake_fds is not None and threading.get_ident() != self.loop_thread):
+			try: os.write(self.wake_fds[1], b'\0')
+			except BlockingIOError: pass  # already woken up
+
+	def setTimer(self, target: SCView | SCWindow, delay: float, interval: float | None = None) -> list:
+		""" Wake `target' up after `delay' seconds, then every `interval' seconds if given.
+		The timer is dropped once `target' dies. Return: timer to pass to `.cancelTimer()'.
+		"""
+
+		self.timer_seq += 1
+		timer = [time.monotonic() + delay, self.timer_seq, weakref.ref(target), interval]
+		heapq.heappush(self.timers, timer)
+		return timer
+
+	def cancelTimer(self, timer: list):
+		timer[2] = None
+
+	def key(self, c: SCKey) -> bool -- ret:
+		if (c == curses.KEY_RESIZE and self.output is not None and self.inscr is not None): self.output.resize(*self.inscr.getmaxyx())
+		return super().key(c)
+
+	def newpad(self, nlines: int, ncols: int):
+		if (self.output is not None): return self.output.newpad(nlines, ncols)
+		return curses.newpad(nlines, ncols)
+
+	def doupdate(self):
+		if (self.output is not None): self.output.doupdate()
+		else: curses.doupdate()
+
+	def frame(self):
+		if (self.recorder is not None): damage, start = sum(view.touched for view in self.views), time.perf_counter()
+		self.draw()
+		self.doupdate()
+		self.lastframe = time.time()
+		if (self.recorder is not None): self.recorder.frame(time.perf_counter() - start, damage, self.output.frame_bytes if (self.output is not None) else 0)
+
 	def _run_loop(self, stdscr):
+		self.inscr = stdscr
+		if (self.output is not None):
+			stdscr.nodelay(True)
+			stdscr.refresh()
+			self.output.start(*stdscr.getmaxyx())
+			stdscr = self.output.screen
 		self.stdscr = stdscr
+		if (self.recorder is not None): self.recorder.size(*self.inscr.getmaxyx())
 		self.init()
+		self.inscr.nodelay(True)
 
-		try:
-			while (True):
-				if (not self.views): break
+		import select, signal
+		self.wake_fds, self.loop_thread = os.pipe(), threading.get_ident()
+		for fd in self.wake_fds: os.set_blocking(fd, False)
+		sigwinch = signal.signal(signal.SIGWINCH, lambda *_: os.write(self.wake_fds[1], b'\0'))  # instead of curses' own handler, which cannot interrupt the wait
 
+		try:
+			while (self.views):
 				self.proc()
 
-				try: self.key(SCKey(self.stdscr.get_wch()))
+				try: c = SCKey(self.inscr.get_wch())
 				except curses.error:
-					if (time.time() < self.lastframe+self.frame_delay): continue
-					self.key(SCKey(-1))
-
-				self.draw()
-				curses.doupdate()
-
-				self.lastframe = time.time()
+					timeout = self._waitTime()
+					if (timeout is None or timeout > 0):
+						ready = select.select((sys.stdin.fileno(), self.wake_fds[0]), (), (), timeout)[0]
+						if (self.wake_fds[0] in ready):
+							while (True):
+								try: os.read(self.wake_fds[0], 4096)
+								except BlockingIOError: break
+							self._checkSize()
+					if (time.time() >= self.lastframe+self.frame_delay and self.touched): self.frame()
+					continue
+
+				if (self.recorder is not None):
+					if (c == curses.KEY_RESIZE): self.recorder.size(*self.inscr.getmaxyx())
+					else: self.recorder.key(c)
+				self.key(c)
+
+				self.frame()
 		finally:
+			signal.signal(signal.SIGWINCH, sigwinch)
+			for fd in self.wake_fds: os.close(fd)
+			self.wake_fds = self.loop_thread = None
 			self.die()
-			self.stdscr = None
+			if (self.output is not None): self.output.stop()
+			if (self.recorder is not None): self.recorder.close()
+			self.stdscr = self.inscr = None
+
+	def _waitTime(self) -> float | None:
+		""" Seconds the main loop may wait for input before it has something to do, or `None' if nothing is due. """
+
+		if (self.wakeups): return 0
+
+		wait = None
+		if (self.touched): wait = (self.lastframe + self.frame_delay - time.time())
+		if (self.pollers): wait = min(wait if (wait is not None) else self.proc_delay, self.proc_delay)
+		if (self.timers):
+			due = (self.timers[0][0] - time.monotonic())
+			wait = (min(wait, due) if (wait is not None) else due)
+
+		return (max(wait, 0) if (wait is not None) else None)
+
+	def _checkSize(self):
+		""" Resize curses to the terminal after a `SIGWINCH', which queues `KEY_RESIZE'. """
+
+		try: w, h = os.get_terminal_size(sys.stdout.fileno())
+		except OSError: return
+		if ((h, w) != self.inscr.getmaxyx()): curses.resizeterm(h, w)
 
 	def run(self):
+		_utils()
 		return curses.wrapper(self._run_loop)
 
-class SCKey(TypeInit):
+class SCRecorder(Slots):
+	""" Records timestamped input and per-frame stats of an `SCApp' for `SCReplay'.
+	The file is a header followed by fixed-size little-endian records:
+		K: time (double), key code (int32)
+		R: time (double), height, width (uint16)
+		F: time (double), draw duration (float), views redrawn, bytes written (uint32)
+	"""
+
+	magic = b'SCREC\x01'
+	records = {
+		b'K': struct.Struct('<cdi'),
+		b'R': struct.Struct('<cdHH'),
+		b'F': struct.Struct('<cdfII'),
+	}
+
 	# public:
-	c: int
-	ch: str
+	file: '# io.BufferedWriter'
+	start: float
+
+	def __init__(self, path: str):
+		self.file = open(path, 'wb')
+		self.file.write(self.magic)
+		self.start = time.perf_counter()
+
+	def key(self, c: SCKey):
+		self.file.write(self.records[b'K'].pack(b'K', time.perf_counter() - self.start, c.c))
+
+	def size(self, nlines: int, ncols: int):
+		self.file.write(self.records[b'R'].pack(b'R', time.perf_counter() - self.start, nlines, ncols))
+
+	def frame(self, duration: float, damage: int, nbytes: int):
+		self.file.write(self.records[b'F'].pack(b'F', time.perf_counter() - self.start, duration, damage, nbytes))
+
+	def close(self):
+		self.file.close()
 
-	@dispatch
-	def __init__(self, c: int):
-		self.c, self.ch = c, chr(c) if (c != -1) else ''
+class SCReplay(Slots):
+	""" Drives an app headlessly with input recorded by `SCRecorder',
+	drawing a frame wherever one was drawn in the recording, and measures frame times.
+	"""
+
+	# public:
+	events: list[tuple]; '(kind, time, *args)'
+
+	def __init__(self, path: str):
+		with open(path, 'rb') as f:
+			data = f.read()
+		if (not data.startswith(SCRecorder.magic)): raise ValueError(f"Not a Scurses recording: {path!r}")
+
+		self.events = list()
+		i = len(SCRecorder.magic)
+		while (i < len(data)):
+			rec = SCRecorder.records[data[i:i+1]]
+			self.events.append(rec.unpack_from(data, i))
+			i += rec.size
+
+	def run(self, app: SCApp, *, speed: float | None = None) -> dict:
+		""" Replay into `app', with the recorded timing divided by `speed', or as fast as possible if `speed' is `None'.
+		Return: stats dict: frames, bytes, recorded and replayed frame time percentiles (p50, p90, p99, max).
+		"""
+
+		size = next((e[2:] for e in self.events if e[0] == b'R'), (24, 80))
+		fd = os.open(os.devnull, os.O_WRONLY)
+		try:
+			app.output, app.inscr = SCTermWriter(fd, sync=False), None
+			app.output.start(*size)
+			app.stdscr = app.output.screen
+			app.init()
+
+			times, recorded = list(), list()
+			start = time.perf_counter()
+			for kind, t, *args in self.events:
+				if (speed is not None and (delay := start + t/speed - time.perf_counter()) > 0): time.sleep(delay)
+
+				if (kind == b'K'):
+					app.proc()
+					app.key(SCKey(args[0]))
+				elif (kind == b'R'):
+					app.output.resize(*args)
+					app.key(SCKey(curses.KEY_RESIZE))
+				elif (kind == b'F'):
+					app.proc()
+					t0 = time.perf_counter()
+					app.frame()
+					times.append(time.perf_counter() - t0)
+					recorded.append(args[0])
+		finally:
+			app.die()
+			os.close(fd)
+
+		return {
+			'frames': len(times),
+			'bytes': app.output.total_bytes,
+			'recorded': self.percentiles(recorded),
+			'replayed': self.percentiles(times),
+		}
+
+	@staticmethod
+	def percentiles(times: list[float]) -> dict[str, float]:
+		if (not times): return {}
+		times = sorted(times)
+		return {f"p{p}": times[min(len(times)-1, len(times)*p//100)] for p in (50, 90, 99)} | {'max': times[-1]}
+
+class SCCellWindow(Slots):
+	""" In-memory stand-in for `curses.window' used with `SCTermWriter'.
+	Supports the subset of the window API the views use.
+	"""
+
+	blank = (' ', 0)
+
+	# public:
+	cells: list[list[tuple[str, int]]]
+	ncols: int
+	y: int
+	x: int
+
+	# private:
+	target: SCCellWindow | None; 'screen `.noutrefresh()\' copies to'
+
+	def __init__(self, nlines: int, ncols: int, target: SCCellWindow | None = None):
+		self.target = target
+		self.y = self.x = 0
+		self.resize(nlines, ncols)
+
+	def getmaxyx(self) -> (int, int):
+		return (len(self.cells), self.ncols)
+
+	def getyx(self) -> (int, int):
+		return (self.y, self.x)
+
+	def resize(self, nlines: int, ncols: int):
+		self.cells = [[self.blank]*ncols for _ in range(nlines)]
+		self.ncols = ncols
+		self.y, self.x = min(self.y, nlines-1), min(self.x, ncols-1)
+
+	def erase(self):
+		for row in self.cells:
+			row[:] = (self.blank,)*self.ncols
+
+	clear = erase
+
+	def clrtoeol(self):
+		row = self.cells[self.y]
+		row[self.x:] = (self.blank,)*(self.ncols - self.x)
+
+	def move(self, y: int, x: int):
+		if (not (0 <= y < len(self.cells) and 0 <= x < self.ncols)): raise curses.error("move() returned ERR")
+		self.y, self.x = y, x
+
+	def addch(self, *args):
+		if (len(args) >= 3): y, x, ch, *attr = args; self.move(y, x)
+		else: ch, *attr = args
+		attr = int(attr[0]) if (attr) else 0
+		if (isinstance(ch, int)):
+			attr |= (ch & ~curses.A_CHARTEXT)
+			ch = chr(ch & curses.A_CHARTEXT)
+		self._put(ch, attr)
+
+	def addstr(self, *args):
+		if (len(args) >= 3): y, x, s, *attr = args; self.move(y, x)
+		else: s, *attr = args
+		self._put(s, int(attr[0]) if (attr) else 0)
+
+	def noutrefresh(self, pminrow=0, pmincol=0, sminrow=0, smincol=0, smaxrow=None, smaxcol=None):
+		target = self.target
+		if (target is None): return
+
+		if (smaxrow is None): smaxrow = (sminrow + len(self.cells) - 1)
+		if (smaxcol is None): smaxcol = (smincol + self.ncols - 1)
+		smaxrow = min(smaxrow, len(target.cells)-1, sminrow + len(self.cells)-1 - pminrow)
+		n = (min(smaxcol, target.ncols-1, smincol + self.ncols-1 - pmincol) - smincol + 1)
+		if (n <= 0): return
+
+		for y in range(max(sminrow, 0), smaxrow+1):
+			target.cells[y][smincol:smincol+n] = self.cells[pminrow + y - sminrow][pmincol:pmincol+n]
+
+	def leaveok(self, flag: bool):
+		pass
+
+	def nodelay(self, flag: bool):
+		pass
+
+	def _put(self, s: str, attr: int):
+		cells, ncols = self.cells, self.ncols
+		y, x = self.y, self.x
+
+		for c in s:
+			if (y >= len(cells)): break
+			if (c == '\n'):
+				cells[y][x:] = (self.blank,)*(ncols - x)
+				y, x = y+1, 0
+				continue
+			cells[y][x] = (c, attr)
+			x += 1
+			if (x >= ncols): y, x = y+1, 0
+
+		if (y >= len(cells)):
+			self.y, self.x = len(cells)-1, ncols-1
+			raise curses.error("addwstr() returned ERR")  # last character of the screen
+		self.y, self.x = y, x
+
+class SCTermWriter(Slots):
+	""" Output backend writing frames straight to a terminal.
+	Keeps the cells currently on screen and sends only the changed ones,
+	with minimal cursor moves and attribute (SGR) changes.
+	With `sync', each frame is wrapped in synchronized output sequences (mode 2026),
+	which terminals that do not support it ignore.
+	"""
+
+	sgr_attrs = (
+		(curses.A_BOLD, '1'),
+		(curses.A_DIM, '2'),
+		(getattr(curses, 'A_ITALIC', 0), '3'),
+		(curses.A_UNDERLINE, '4'),
+		(curses.A_BLINK, '5'),
+		(curses.A_REVERSE | curses.A_STANDOUT, '7'),
+		(curses.A_INVIS, '8'),
+	)
+
+	# public:
+	fd: int
+	sync: bool
+	screen: SCCellWindow; 'frame being drawn'
+	frames: int
+	frame_bytes: int; 'bytes sent for the last frame'
+	total_bytes: int
+	pending: bytearray; 'output a non-blocking `fd\' did not accept yet, see `.flush()\''
+
+	# private:
+	front: list[list[tuple[str, int]]] | None; 'cells on the terminal'
+	cy: int | None
+	cx: int | None
+	cattr: int
+	sgr_cache: dict[tuple[int, int], str]
+	pair_colors: dict[int, tuple[int, int]]
+	color_epoch: int; '`SCStyle.pairs.epoch\' the caches are valid for'
+
+	def __init__(self, fd: int | None = None, *, sync: bool = True):
+		self.fd = (fd if (fd is not None) else sys.stdout.fileno())
+		self.sync = sync
+		self.screen = SCCellWindow(1, 1)
+		self.frames = self.frame_bytes = self.total_bytes = 0
+		self.pending = bytearray()
+		self.front = self.cy = self.cx = None
+		self.cattr = 0
+		self.sgr_cache = dict()
+		self.pair_colors = dict()
+		self.color_epoch = SCStyle.pairs.epoch
+
+	def start(self, nlines: int, ncols: int):
+		self.resize(nlines, ncols)
+		self.write('\x1b[?25l')
+
+	def stop(self):
+		self.write('\x1b[0m\x1b[?25h')
+
+	def resize(self, nlines: int, ncols: int):
+		self.screen.resize(nlines, ncols)
+		self.front = None
+
+	def newpad(self, nlines: int, ncols: int) -> SCCellWindow:
+		return SCCellWindow(nlines, ncols, target=self.screen)
+
+	def doupdate(self) -> int:
+		""" Send the changes since the last frame.
+		Return: number of bytes written.
+		"""
+
+		out = list()
+		screen = self.screen.cells
+
+		if (self.color_epoch != SCStyle.pairs.epoch):  # pairs were reassigned, cells on the terminal are stale
+			self.color_epoch = SCStyle.pairs.epoch
+			self.sgr_cache.clear()
+			self.pair_colors.clear()
+			self.front = None
+
+		if (self.front is None or len(self.front) != len(screen)):
+			out.append('\x1b[0m\x1b[H\x1b[2J')
+			self.front = [[SCCellWindow.blank]*self.screen.ncols for _ in screen]
+			self.cy = self.cx = self.cattr = 0
+
+		for y, row in enumerate(screen):
+			front = self.front[y]
+			if (row == front): continue
+			self._diffRow(out, y, row, front)
+			self.front[y] = row.copy()
+
+		self.frames += 1
+		if (not out): self.frame_bytes = 0; return 0
+
+		if (self.sync):
+			out.insert(0, '\x1b[?2026h')
+			out.append('\x1b[?2026l')
+
+		self.frame_bytes = self.write(''.join(out))
+		return self.frame_bytes
+
+	def write(self, s: str) -> int:
+		""" Send `s', queueing what a non-blocking `fd' does not accept right away in `.pending'. """
+
+		data = s.encode('utf-8', 'replace')
+		if (self.pending): self.pending += data
+		else:
+			view = memoryview(data)
+			while (view):
+				try: view = view[os.write(self.fd, view):]
+				except BlockingIOError: self.pending += view; break
+		self.total_bytes += len(data)
+		return len(data)
+
+	def flush(self) -> bool:
+		""" Send as much of `.pending' as `fd' accepts.
+		Return: whether all of it was sent.
+		"""
+
+		while (self.pending):
+			try: n = os.write(self.fd, self.pending)
+			except BlockingIOError: return False
+			del self.pending[:n]
+		return True
+
+	def _diffRow(self, out: list, y: int, row: list, front: list):
+		x, ncols = 0, len(row)
+		while (x < ncols):
+			if (row[x] == front[x]): x += 1; continue
+			self._moveTo(out, y, x, row)
+			c, attr = row[x]
+			if (attr != self.cattr): self._setAttr(out, attr)
+			out.append(c)
+			x += 1
+			self.cx = (x if (x < ncols) else None)  # pending wrap at the last column
+
+	def _moveTo(self, out: list, y: int, x: int, row: list):
+		cx = self.cx
+		if (self.cy == y and cx is not None):
+			if (cx == x): return
+			if (0 < x-cx <= 4 and all(row[i][1] == self.cattr for i in range(cx, x))): out.append(''.join(row[i][0] for i in range(cx, x)))
+			elif (x > cx): out.append(f"\x1b[{x-cx}C")
+			else: out.append(f"\x1b[{y+1};{x+1}H")
+		else: out.append(f"\x1b[{y+1};{x+1}H" if (x) else f"\x1b[{y+1}H")
+		self.cy, self.cx = y, x
+
+	def _setAttr(self, out: list, attr: int):
+		key = (self.cattr, attr)
+		try: sgr = self.sgr_cache[key]
+		except KeyError:
+			old, new = (self.cattr & ~curses.A_COLOR), (attr & ~curses.A_COLOR)
+			reset = bool(old & ~new)
+			params = (['0'] if (reset) else [])
+			params += dict.fromkeys(code for bit, code in self.sgr_attrs if (bit & new and (reset or not bit & old)))
+			if (reset or (self.cattr ^ attr) & curses.A_COLOR): params += self._colorParams(attr, reset)
+			sgr = self.sgr_cache[key] = f"\x1b[{';'.join(params)}m"
+		out.append(sgr)
+		self.cattr = attr
+
+	def _colorParams(self, attr: int, reset: bool) -> list[str]:
+		pair = ((attr & curses.A_COLOR) >> 8)
+		if (not pair): return ([] if (reset) else ['39', '49'])
+
+		try: fg, bg = self.pair_colors[pair]
+		except KeyError:
+			if ((colors := SCStyle.pairs.content(pair)) is not None): fg, bg = colors
+			else:
+				try: fg, bg = curses.pair_content(pair)
+				except curses.error: fg = bg = -1
+			self.pair_colors[pair] = (fg, bg)
+
+		return [self._colorParam(fg, 30), self._colorParam(bg, 40)]
+
+	@staticmethod
+	def _colorParam(color: int, base: int) -> str:
+		if (color < 0): return str(base + 9)
+		if (color < 8): return str(base + color)
+		if (color < 16): return str(base + 60 + color-8)
+		return f"{base+8};5;{color}"
+
+class SCLRUCache(collections.OrderedDict):
+	""" Dict that keeps at most `maxsize' most recently used items. """
+
+	# public:
+	maxsize: int
+
+	def __init__(self, maxsize=65536):
+		super().__init__()
+		self.maxsize = maxsize
 
-	@dispatch
-	def __init__(self, ch: lambda ch: isinstance(ch, str) and len(ch) == 1):
-		self.c, self.ch = ord(ch), ch
+	def __getitem__(self, k):
+		v = super().__getitem__(k)
+		self.move_to_end(k)
+		return v
 
-	@dispatch
-	def __init__(self, ch: lambda ch: isinstance(ch, str) and len(ch) == 2 and ch[0] == '^'):
-		c = (string.ascii_uppercase.index(ch[-1]) + 1)
-		self.c, self.ch = c, chr(c)
+	def __setitem__(self, k, v):
+		super().__setitem__(k, v)
+		self.move_to_end(k)
+		if (len(self) > self.maxsize): self.popitem(last=False)
 
-	@dispatch
-	def __init__(self, k: lambda k: isinstance(k, SCKey)):
-		self.c, self.ch = k.c, k.ch
+class SCColorPairs(Slots):
+	""" LRU allocator of curses color pairs for `SCStyle' colors.
+	Colors the terminal lacks are replaced by the nearest ones it has, pairs are assigned on first use
+	and the least recently used one is reassigned when they run out (incrementing `.epoch').
+	Without a curses color terminal (e.g. `SCTermWriter' sessions) pairs are only kept here.
+	"""
+
+	names = {'default': -1, 'black': 0, 'red': 1, 'green': 2, 'yellow': 3, 'blue': 4, 'magenta': 5, 'cyan': 6, 'white': 7}
+	palette = ((0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0), (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+	           (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0), (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255))
+
+	# public:
+	first: int; 'lowest pair to use, lower ones are left to the app'
+	npairs: int | None; '`None\' until detected'
+	ncolors: int
+	virtual: bool; 'not backed by curses'
+	epoch: int; 'incremented when pairs are reassigned'
+
+	# private:
+	attrs: collections.OrderedDict; '(fg, bg) -> attr, least recently used first'
+	pairs: dict[tuple[int, int], int]; 'terminal (fg, bg) -> pair'
+	contents: dict[int, tuple[int, int]]; 'pair -> terminal (fg, bg)'
+	refs: dict[int, int]; 'pair -> number of `.attrs\' keys using it'
+	nearest_cache: dict
+
+	def __init__(self, first=1):
+		self.first = first
+		self.attrs = collections.OrderedDict()
+		self.pairs, self.contents, self.refs, self.nearest_cache = dict(), dict(), dict(), dict()
+		self.npairs = None
+		self.ncolors = 0
+		self.virtual = False
+		self.epoch = 0
+
+	def reset(self):
+		""" Forget all pairs and detect terminal colors again on next use. """
+
+		self.attrs.clear()
+		self.pairs.clear()
+		self.contents.clear()
+		self.refs.clear()
+		self.nearest_cache.clear()
+		self.npairs = None
+		self.epoch += 1
+
+	def attr(self, fg, bg) -> int:
+		""" Return color attr for colors `fg' and `bg' (see `SCStyle.color()'), allocating a pair if needed. """
+
+		key = (fg, bg)
+		attrs = self.attrs
+		try: attr = attrs[key]
+		except KeyError: pass
+		else:
+			attrs.move_to_end(key)
+			return attr
+
+		if (self.npairs is None): self._detect()
+		colors = (self.nearest(fg), self.nearest(bg))
+		if (not self.npairs or colors == (-1, -1)): attr = 0
+		elif ((pair := self.pairs.get(colors)) is not None): attr = self._pairAttr(pair)
+		else:
+			if (len(self.contents) < self.npairs - self.first): pair = (self.first + len(self.contents))
+			else: pair = self._evict()
+			try:
+				if (not self.virtual): curses.init_pair(pair, *colors)
+			except curses.error: self.refs[pair] = 0; attr = 0  # e.g. no default colors
+			else:
+				self.pairs[colors] = pair
+				self.contents[pair] = colors
+				attr = self._pairAttr(pair)
+
+		if (attr): self.refs[pair] = (self.refs.get(pair, 0) + 1)
+		attrs[key] = attr
+		return attr
+
+	def content(self, pair: int) -> tuple[int, int] | None:
+		""" Return terminal (fg, bg) of `pair' if it was allocated here. """
+
+		return self.contents.get(pair)
+
+	def nearest(self, color) -> int:
+		""" Return the terminal color closest to `color'. """
+
+		try: return self.nearest_cache[color]
+		except KeyError: pass
+
+		if (color == -1 or (isinstance(color, int) and color < self.ncolors)): r = color
+		else:
+			rgb = self.rgb(color)
+			r = min(range(min(self.ncolors, 256)), key=lambda i: sum((a - b)**2 for a, b in zip(rgb, self.rgb(i))))
+
+		self.nearest_cache[color] = r
+		return r
+
+	@classmethod
+	def rgb(cls, color) -> tuple[int, int, int]:
+		""" Return (r, g, b) of a 256-color palette index, or `color' itself if it is an (r, g, b) tuple. """
+
+		if (isinstance(color, tuple)): return color
+		if (color < 16): return cls.palette[max(color, 0)]
+		if (color >= 232): return ((8 + (color-232)*10),)*3
+		color -= 16
+		return tuple((55 + 40*i if (i) else 0) for i in (color // 36, color // 6 % 6, color % 6))
+
+	def _detect(self):
+		try:
+			if (not curses.has_colors()): self.npairs = 0; return
+			if (not hasattr(curses, 'COLORS')): curses.start_color()
+			try: curses.use_default_colors()
+			except curses.error: pass
+		except curses.error:  # curses is not initialized
+			self.virtual = True
+			self.npairs = self.ncolors = 256
+		else:
+			self.virtual = False
+			self.npairs, self.ncolors = min(curses.COLOR_PAIRS, 256), curses.COLORS
+
+	def _pairAttr(self, pair: int) -> int:
+		if (self.virtual): return ((pair << 8) & curses.A_COLOR)  # as `curses.color_pair()'
+		return curses.color_pair(pair)
+
+	def _evict(self) -> int:
+		while (True):
+			key, attr = self.attrs.popitem(last=False)
+			if (not attr): continue
+			pair = ((attr & curses.A_COLOR) >> 8)
+			self.refs[pair] -= 1
+			if (self.refs[pair] > 0): continue
+			del self.refs[pair]
+			if ((colors := self.contents.pop(pair, None)) is not None): del self.pairs[colors]
+			self.epoch += 1
+			return pair
+
+class SCStyle(Slots):
+	""" Interned text style: foreground and background colors and `curses.A_*' attrs.
+	Colors are -1 (default), 0..255, names like 'red' or 'bright_red', or '#rrggbb'.
+	Usable wherever an attrs int is: `int(style)', `curses.A_BOLD | style'; see `SCColorPairs'.
+	"""
+
+	pairs = SCColorPairs()
+	instances = dict()
+
+	# public:
+	fg: int | tuple[int, int, int]
+	bg: int | tuple[int, int, int]
+	attrs: int
+
+	def __new__(cls, fg=-1, bg=-1, attrs=0):
+		key = (cls.color(fg), cls.color(bg), int(attrs))
+		try: return cls.instances[key]
+		except KeyError: pass
+
+		self = cls.instances[key] = super().__new__(cls)
+		self.fg, self.bg, self.attrs = key
+		return self
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}(fg={self.fg!r}, bg={self.bg!r}, attrs={self.attrs:#x})"
+
+	def __int__(self):
+		return (self.attrs | self.pairs.attr(self.fg, self.bg))
+
+	__index__ = __int__
+
+	def __or__(self, other):
+		if (isinstance(other, SCStyle)): return SCStyle(other.fg if (other.fg != -1) else self.fg, other.bg if (other.bg != -1) else self.bg, self.attrs | other.attrs)
+		return (int(self) | other)
+
+	def __ror__(self, other):
+		return (other | int(self))
+
+	def replace(self, **kwargs) -> SCStyle:
+		return SCStyle(**{'fg': self.fg, 'bg': self.bg, 'attrs': self.attrs, **kwargs})
+
+	@staticmethod
+	def color(c) -> int | tuple[int, int, int]:
+		if (c is None): return -1
+		if (isinstance(c, str)):
+			if (c.startswith('#')): return tuple(int(c[i:i+2], 16) for i in (1, 3, 5))
+			c = c.lower().replace(' ', '_')
+			if (c.startswith('bright_')): return (SCColorPairs.names[c[7:]] + 8)
+			return SCColorPairs.names[c]
+		if (isinstance(c, tuple)): return tuple(map(int, c))
+		return int(c)
+
+class SCKeyDecoder(Slots):
+	""" Decodes raw terminal input into keys the way `curses.window.get_wch()' returns them:
+	`int' codes for special keys and `str' for characters.
+	"""
+
+	sequences = {
+		b'\x1b[A': curses.KEY_UP, b'\x1bOA': curses.KEY_UP,
+		b'\x1b[B': curses.KEY_DOWN, b'\x1bOB': curses.KEY_DOWN,
+		b'\x1b[C': curses.KEY_RIGHT, b'\x1bOC': curses.KEY_RIGHT,
+		b'\x1b[D': curses.KEY_LEFT, b'\x1bOD': curses.KEY_LEFT,
+		b'\x1b[H': curses.KEY_HOME, b'\x1bOH': curses.KEY_HOME, b'\x1b[1~': curses.KEY_HOME, b'\x1b[7~': curses.KEY_HOME,
+		b'\x1b[F': curses.KEY_END, b'\x1bOF': curses.KEY_END, b'\x1b[4~': curses.KEY_END, b'\x1b[8~': curses.KEY_END,
+		b'\x1b[2~': curses.KEY_IC,
+		b'\x1b[3~': curses.KEY_DC,
+		b'\x1b[5~': curses.KEY_PPAGE,
+		b'\x1b[6~': curses.KEY_NPAGE,
+		b'\x1b[Z': curses.KEY_BTAB,
+		b'\x1b[1;2A': curses.KEY_SR,
+		b'\x1b[1;2B': curses.KEY_SF,
+		b'\x1b[1;3A': 565,  # M-Up
+		b'\x1b[1;3B': 524,  # M-Down
+		b'\x1b[1;5H': 536,  # ^Home
+		b'\x1b[1;5F': 531,  # ^End
+		b'\x1bOP': curses.KEY_F1, b'\x1bOQ': curses.KEY_F2, b'\x1bOR': curses.KEY_F3, b'\x1bOS': curses.KEY_F4,
+		b'\x1b[15~': curses.KEY_F5, b'\x1b[17~': curses.KEY_F6, b'\x1b[18~': curses.KEY_F7, b'\x1b[19~': curses.KEY_F8,
+		b'\x1b[20~': curses.KEY_F9, b'\x1b[21~': curses.KEY_F10, b'\x1b[23~': curses.KEY_F11, b'\x1b[24~': curses.KEY_F12,
+		b'\x1b[1;2R': curses.KEY_F15,  # S-F3
+	}
+
+	# public:
+	cpr: tuple[int, int] | None; 'last cursor position report'
+	expect_cpr: bool
+
+	# private:
+	buf: bytes
+
+	def __init__(self):
+		self.buf = bytes()
+		self.cpr = None
+		self.expect_cpr = False
+
+	def feed(self, data: bytes) -> list[int | str]:
+		self.buf += data
+		keys = list()
+
+		while (self.buf):
+			buf = self.buf
+
+			if (buf[0] == 0x1b):
+				if (len(buf) < 2): break  # wait for the rest or `.flush()'
+				if (buf[1] == ord('[')):
+					for n in range(2, len(buf)):
+						if (0x40 <= buf[n] <= 0x7e): break
+					else:
+						if (len(buf) < 16): break
+						n = 0
+					n += 1
+				elif (buf[1] == ord('O')):
+					if (len(buf) < 3): break
+					n = 3
+				else: n = 1
+
+				seq, self.buf = buf[:n], buf[n:]
+				if (n == 1): keys.append('\x1b')
+				elif (self.expect_cpr and (m := re.fullmatch(rb'\x1b\[(\d+);(\d+)R', seq))):
+					self.cpr = (int(m[1]), int(m[2]))
+					self.expect_cpr = False
+				elif ((k := self.sequences.get(seq)) is not None): keys.append(k)
+				continue
+
+			n = (1 if (buf[0] < 0x80) else 2 if (buf[0] < 0xe0) else 3 if (buf[0] < 0xf0) else 4)
+			if (len(buf) < n): break
+			ch, self.buf = buf[:n].decode('utf-8', 'replace'), buf[n:]
+			if (ch == '\r'): ch = '\n'
+			keys.append(curses.KEY_BACKSPACE if (ch == '\x7f') else ch)
+
+		return keys
+
+	def flush(self) -> list[int | str]:
+		""" Return an incomplete escape sequence as separate characters. """
+
+		keys, self.buf = list(self.buf.decode('utf-8', 'replace')), bytes()
+		return keys
+
+class SCSession(SCApp):
+	""" App instance served by `SCServer' on a single terminal (a pty or a socket).
+	Its views, focus and scroll state are its own; the data they show may be shared.
+	The terminal is put in non-blocking mode, so a client that stops reading only fills its own `output.pending'.
+	"""
+
+	# public:
+	fd: int
+	decoder: SCKeyDecoder
+
+	# private:
+	istty: bool
+	lastinput: float
+
+	def __init__(self, fd: int, *, render_cache=None, **kwargs):
+		super().__init__(output=SCTermWriter(fd), **kwargs)
+		self.fd = fd
+		self.render_cache = render_cache
+		self.decoder = SCKeyDecoder()
+		self.istty = os.isatty(fd)
+		os.set_blocking(fd, False)
+
+	def open(self):
+		if (self.istty):
+			import tty
+			tty.setraw(self.fd)
+		self.output.write('\x1b[?1049h')
+		self.output.start(*self.getsize())
+		self.stdscr = self.output.screen
+		if (not self.istty):
+			self.decoder.expect_cpr = True
+			self.output.write('\x1b7\x1b[999;999H\x1b[6n\x1b8')
+
+	def close(self):
+		self.die()
+		try:
+			self.output.stop()
+			self.output.write('\x1b[?1049l')
+			self.output.flush()
+		except OSError: pass
+
+	def getsize(self) -> (int, int):
+		if (self.decoder.cpr is not None): return self.decoder.cpr
+		if (self.istty):
+			try: w, h = os.get_terminal_size(self.fd)
+			except OSError: pass
+			else:
+				if (h and w): return (h, w)
+		return (24, 80)
+
+	def resize(self):
+		h, w = self.getsize()
+		if (self.stdscr.getmaxyx() == (h, w)): return
+		self.output.resize(h, w)
+		self.key(SCKey(curses.KEY_RESIZE))
+
+	def feed(self, data: bytes):
+		self.lastinput = time.time()
+		for k in self.decoder.feed(data):
+			self.key(SCKey(k))
+		if (self.decoder.cpr is not None): self.resize()
+
+	def proc(self) -> bool -- ret:
+		if (self.decoder.buf and time.time() - self.lastinput > self.esc_delay/1000):
+			for k in self.decoder.flush():
+				self.key(SCKey(k))
+		if (self.istty): self.resize()
+		return super().proc()
+
+class SCServer(TypeInit):
+	""" Serves one process's data to many terminals at once.
+	Every attached terminal gets its own `SCSession', which `factory(session)' fills with views.
+	Data shown by those views and the `render_cache' are shared by all sessions.
+	Socket clients should put their terminal in raw mode, e.g. `socat -,raw,echo=0 UNIX-CONNECT:<path>'.
+	"""
+
+	# public:
+	factory: '# callable'
+	sessions: list[SCSession]
+	frame_delay: float
+	render_cache: '# SCLRUCache'
+	output_limit: int; 'unsent bytes after which a session that does not read its output is detached'
+	running: bool
+
+	# private:
+	selector: '# selectors.BaseSelector'
+	session_kwargs: dict
+
+	def __init__(self, factory, *, frame_rate=60, cache_size=65536, output_limit=1 << 20, **session_kwargs):
+		self.factory = factory
+		self.frame_delay = 1/frame_rate
+		self.render_cache = SCLRUCache(cache_size)
+		self.output_limit = output_limit
+
+		import selectors
+		self.selector = selectors.DefaultSelector()
+		self.session_kwargs = session_kwargs
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.close()
+
+	def listen(self, path: str) -> socket.socket:
+		""" Accept sessions on a Unix socket at `path'. """
+
+		import selectors, socket
+
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.bind(path)
+		sock.listen()
+		sock.setblocking(False)
+		self.selector.register(sock, selectors.EVENT_READ, None)
+		return sock
+
+	def attach(self, fd: int) -> SCSession:
+		""" Start a session on terminal `fd' (a pty slave or a connected socket), which is then owned by the server. """
+
+		import selectors
+
+		session = SCSession(fd, render_cache=self.render_cache, **self.session_kwargs)
+		session.open()
+		self.factory(session)
+		session.init()
+		self.sessions.append(session)
+		self.selector.register(fd, selectors.EVENT_READ, session)
+		return session
+
+	def openpty(self) -> (SCSession -- session, int -- master):
+		""" Start a session on a new pty; the client side is the returned master fd. """
+
+		master, slave = os.openpty()
+		return (self.attach(slave), master)
+
+	def detach(self, session: SCSession):
+		try: self.sessions.remove(session)
+		except ValueError: return
+		self.selector.unregister(session.fd)
+		session.close()
+		os.close(session.fd)
+
+	def step(self, timeout: float | None = None):
+		""" Process input and draw a frame for every session that needs one.
+		A session whose previous output is still pending skips frames until it is sent
+		(the next frame is diffed against what was queued, so it covers the skipped ones),
+		and is detached once more than `output_limit' bytes are pending.
+		"""
+
+		import selectors
+
+		for k, mask in self.selector.select(self.frame_delay if (timeout is None) else timeout):
+			if (k.data is None):
+				try: conn, _ = k.fileobj.accept()
+				except BlockingIOError: continue
+				self.attach(conn.detach())
+				continue
+
+			session = k.data
+			if (mask & selectors.EVENT_WRITE):
+				try: session.output.flush()
+				except OSError: self.detach(session); continue
+
+			if (mask & selectors.EVENT_READ):
+				try: data = os.read(k.fd, 4096)
+				except BlockingIOError: continue
+				except OSError: data = b''
+				if (data): session.feed(data)
+				else: self.detach(session)
+
+		now = time.time()
+		for session in self.sessions[:]:
+			session.proc()
+			if (not session.views): self.detach(session); continue
+
+			output = session.output
+			if (session.touched and not output.pending and now >= session.lastframe + self.frame_delay):
+				try: session.frame()
+				except OSError: self.detach(session); continue
+			if (len(output.pending) > self.output_limit): self.detach(session); continue
+
+			events = (selectors.EVENT_READ | selectors.EVENT_WRITE*bool(output.pending))
+			if (self.selector.get_key(session.fd).events != events): self.selector.modify(session.fd, events, session)
+
+	def run(self):
+		_utils()
+		self.running = True
+		try:
+			while (self.running):
+				self.step()
+		finally: self.close()
+
+	def stop(self):
+		self.running = False
+
+	def close(self):
+		for session in self.sessions[:]:
+			self.detach(session)
+		for k in tuple(self.selector.get_map().values()):
+			self.selector.unregister(k.fileobj)
+			k.fileobj.close()
+
+class SCChannel(Slots):
+	""" Single-producer single-consumer ring buffer of byte records in `multiprocessing.shared_memory'.
+	The consumer creates it, the producer (e.g. a worker process) attaches by `.name'.
+	A record with its 4-byte length takes at most half of `.capacity', so one that has to wrap always fits once the consumer catches up.
+	No locks: each side only writes its own position, relying on aligned 8-byte stores being atomic.
+	"""
+
+	header = 128  # read position at 0, write position at 64, closed flag at 72
+	pad = 0xFFFFFFFF
+
+	# public:
+	name: str
+	capacity: int
+
+	# private:
+	shm: '# multiprocessing.shared_memory.SharedMemory'
+	buf: memoryview
+	owner: bool
+	head: int; 'read position as last seen'
+	tail: int; 'write position as last seen'
+
+	def __init__(self, name: str | None = None, capacity: int = 1 << 20):
+		""" Create a new channel with `capacity' bytes of data, or attach to the existing one called `name'. """
+
+		from multiprocessing import shared_memory
+
+		self.owner = (name is None)
+		if (self.owner): self.shm = shared_memory.SharedMemory(create=True, size=self.header + capacity)
+		else:
+			try: self.shm = shared_memory.SharedMemory(name, track=False)
+			except TypeError: self.shm = shared_memory.SharedMemory(name)  # before 3.13, tracked again by the (shared) resource tracker
+		self.buf = self.shm.buf
+		self.name = self.shm.name
+		self.capacity = (self.shm.size - self.header)
+		if (self.owner): self.buf[:self.header] = bytes(self.header)
+		self.head, self.tail = struct.unpack_from('<Q', self.buf, 0)[0], struct.unpack_from('<Q', self.buf, 64)[0]
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.close()
+
+	def put(self, data: bytes, timeout: float | None = None) -> bool:
+		""" Write record `data', waiting up to `timeout' seconds (forever if `None') for free space.
+		Return: whether it was written, `False' on timeout or if the consumer closed the channel.
+		"""
+
+		n = (4 + len(data))
+		if (n > self.capacity // 2): raise ValueError(f"Record of {len(data)} bytes is over half of the channel capacity {self.capacity}")
+
+		buf, tail, capacity = self.buf, self.tail, self.capacity
+		off = (tail % capacity)
+		skip = ((capacity - off) if (capacity - off < n) else 0)
+		deadline = (time.monotonic() + timeout if (timeout is not None) else None)
+		while (tail + skip + n - self.head > capacity):
+			self.head = struct.unpack_from('<Q', buf, 0)[0]
+			if (tail + skip + n - self.head <= capacity): break
+			if (self.closed or (deadline is not None and time.monotonic() >= deadline)): return False
+			time.sleep(0.001)
+
+		if (skip):
+			if (skip >= 4): struct.pack_into('<I', buf, self.header + off, self.pad)
+			tail += skip
+			off = 0
+
+		start = (self.header + off)
+		buf[start+4:start+n] = data
+		struct.pack_into('<I', buf, start, len(data))
+		self.tail = tail = (tail + n)
+		struct.pack_into('<Q', buf, 64, tail)
+		return True
+
+	def get(self, limit: int | None = None) -> list[bytes]:
+		""" Read up to `limit' available records (all if `None'), without waiting. """
+
+		buf, head, capacity = self.buf, self.head, self.capacity
+		tail = struct.unpack_from('<Q', buf, 64)[0]
+		r = list()
+		while (head < tail and (limit is None or len(r) < limit)):
+			off = (head % capacity)
+			if (capacity - off < 4): head += (capacity - off); continue
+			start = (self.header + off)
+			n = struct.unpack_from('<I', buf, start)[0]
+			if (n == self.pad): head += (capacity - off); continue
+			r.append(bytes(buf[start+4:start+4+n]))
+			head += (4 + n)
+
+		if (head != self.head):
+			self.head = head
+			struct.pack_into('<Q', buf, 0, head)
+		return r
+
+	def close(self):
+		""" Detach, and destroy the channel if it was created here. A waiting producer gives up. """
+
+		if (self.buf is None): return
+		if (self.owner): struct.pack_into('<Q', self.buf, 72, 1)
+		self.buf.release()
+		self.buf = None
+		self.shm.close()
+		if (self.owner): self.shm.unlink()
+
+	@property
+	def closed(self) -> bool:
+		return bool(struct.unpack_from('<Q', self.buf, 72)[0])
+
+class SCWorkerPool(TypeInit):
+	""" Runs row producers in worker processes and streams their rows to lists through `SCChannel's.
+	The UI process only copies the encoded rows; views decode the ones they draw (see `SCListView.decode()').
+	"""
+
+	class Task(Slots):
+		# public:
+		channel: SCChannel
+		future: '# concurrent.futures.Future'
+		into: list
+		view: SCView | None
+		done: callable | None
+
+		def __init__(self, channel, future, into, view, done):
+			self.channel, self.future, self.into, self.view, self.done = channel, future, into, view, done
+
+	# public:
+	processes: int | None
+	capacity: int; 'channel size per task'
+	limit: int; 'rows taken from each task per pass'
+	interval: float; 'seconds between passes while tasks run'
+	died: bool
+
+	# private:
+	executor: '# concurrent.futures.ProcessPoolExecutor | None'
+	tasks: list[SCWorkerPool.Task]
+	appref: '# weakref.ref'
+	timer: list | None = None
+
+	def __init__(self, app: SCApp, processes: int | None = None, *, capacity: int = 1 << 20, limit: int = 4096, interval: float = 0.01):
+		self.appref = weakref.ref(app)
+		self.processes, self.capacity, self.limit, self.interval = processes, capacity, limit, interval
+		self.executor = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.close()
+
+	def submit(self, fn, *args, into: list, view: SCView | None = None, done: callable | None = None) -> SCWorkerPool.Task:
+		""" Run generator function `fn(*args)' in a worker process, appending the `str' or `bytes' rows it yields to `into'.
+		`fn' must be picklable (a module level function). `view' is touched as rows arrive,
+		`done(result)' is called in this process with the generator's return value after its last row.
+		"""
+
+		if (self.executor is None):
+			import concurrent.futures
+			self.executor = concurrent.futures.ProcessPoolExecutor(self.processes)
+
+		channel = SCChannel(capacity=self.capacity)
+		task = self.Task(channel, self.executor.submit(self._run, channel.name, fn, args), into, view, done)
+		self.tasks.append(task)
+		if (self.timer is None and (app := self.appref()) is not None): self.timer = app.setTimer(self, self.interval, self.interval)
+		return task
+
+	def proc(self):
+		""" Move available rows to their lists, finish completed tasks. Called by the app's timer. """
+
+		for task in self.tasks[:]:
+			finished = task.future.done()
+			if (rows := task.channel.get(None if (finished) else self.limit)):
+				task.into.extend(rows)
+				if (task.view is not None and not isinstance(task.into, SCObservableList)): task.view.touch()
+			if (not finished): continue
+
+			self.tasks.remove(task)
+			task.channel.close()
+			result = task.future.result()  # reraises worker exceptions
+			if (task.done is not None): task.done(result)
+			if (task.view is not None): task.view.touch()
+
+		if (not self.tasks and self.timer is not None):
+			self.timer[2] = None  # see `SCApp.cancelTimer()'
+			self.timer = None
+
+	def cancel(self, task: SCWorkerPool.Task):
+		""" Stop streaming `task': its producer gives up at the next full channel. """
+
+		task.future.cancel()
+		task.channel.close()
+		try: self.tasks.remove(task)
+		except ValueError: pass
+
+	def close(self):
+		for task in self.tasks[:]:
+			self.cancel(task)
+		if (self.executor is not None): self.executor.shutdown(cancel_futures=True)
+		self.executor = None
+		self.died = True
+
+	@staticmethod
+	def _run(name: str, fn, args: tuple):
+		channel = SCChannel(name)
+		try:
+			it = fn(*args)
+			while (True):
+				try: row = next(it)
+				except StopIteration as ex: return ex.value
+				if (not channel.put(row if (isinstance(row, bytes)) else str(row).encode('utf-8'))): return None  # cancelled
+		finally: channel.close()
+
+class SCKey(TypeInit):
+	# public:
+	c: int
+	ch: str
+
+	def __init__(self, c: int | str | SCKey):
+		if (isinstance(c, SCKey)): self.c, self.ch = c.c, c.ch
+		elif (isinstance(c, int)): self.c, self.ch = c, chr(c) if (c != -1) else ''
+		elif (isinstance(c, str) and len(c) == 1): self.c, self.ch = ord(c), c
+		elif (isinstance(c, str) and len(c) == 2 and c[0] == '^'):
+			c = (string.ascii_uppercase.index(c[-1]) + 1)
+			self.c, self.ch = c, chr(c)
+		else: raise TypeError(c)
 
 	def __repr__(self):
 		return f"{self.c} ({repr(self.ch)})"
@@ -238,37 +1728,54 @@ class SCKey(TypeInit):
 		if (c and isinstance(c, str) and c[0] == '^'): c = (string.ascii_uppercase.index(c[-1]) + 1)
 		return (c in (self.c, self.ch))
 
-class SCView(TypeInit):
-	# public:
-	width: int
-	height: int
-	erase: bool = True
-	transparent: bool
-	touched: bool
-	died: bool
+class SCViewBase:
+	""" Behaviour shared by `SCView' and `SCSlotsView'. """
 
-	def __del__(self):
-		try: die = self.die
-		except AttributeError: pass
-		else: die()
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.die()
 
 	def init(self):
 		""" Initialize self after `curses.initscr()'. """
 
+		if (self.poll and (app := self._scheduler) is not None): app.pollers.add(self)
 		self.touch()
 
 	def die(self) -> bool -- ret:
 		if (self.died): return True  # exactly in that order
 		self.died = True
+		if ((app := self._scheduler) is not None):
+			app.pollers.discard(self)
+			if ((parent := self.parent) is not None): app.wakeup(parent)  # to remove self
 
 	def proc(self) -> bool -- ret:
 		""" Process before `.draw()', e.g. check some condition to call `.touch()'.
+		Called only after `.wakeup()' or a `.setTimer()' timer fires, or on every pass if `.poll' is set.
 		Note there's no `stdscr' passed here.
 		You may use `.touched' meant for the upcoming frame here.
 		Return: (ret)
 			ret: stop recursive subclass processing.
 		"""
 
+	def wakeup(self):
+		""" Call `.proc()' on the next pass of the main loop. Safe to call from other threads. """
+
+		if ((app := self._scheduler) is not None): app.wakeup(self)
+
+	def setTimer(self, delay: float, interval: float | None = None) -> list | None:
+		""" Call `.proc()' after `delay' seconds, then every `interval' seconds if given, until `.die()'.
+		Return: timer to pass to `.cancelTimer()'.
+		"""
+
+		if ((app := self._scheduler) is not None): return app.setTimer(self, delay, interval)
+
+	def cancelTimer(self, timer: list | None):
+		if (timer is not None): timer[2] = None
+
 	def draw(self, stdscr) -> bool -- ret:
 		""" Draw self to `stdscr'.
 		Return: (ret)
@@ -281,17 +1788,83 @@ class SCView(TypeInit):
 		if (self.erase and not self.transparent): stdscr.erase()
 
 	def touch(self):
+		if (not self.touched): self._touchParent()
 		self.touched = True
 
 	def touchAll(self):
 		self.touch()
 
+	def _touchParent(self):
+		""" Wake the parent window up and mark the views drawing it for redraw, without touching their other children. """
+
+		if ((app := self._scheduler) is None or (parent := self.parent) is None): return
+		app.wakeup(parent)
+		if ((owner := parent.owner) is not None and not owner.touched):
+			owner._touchParent()
+			owner.touched = True
+
 	def key(self, c: SCKey) -> bool -- ret:
 		""" Key pressed callback.
 		Return: (ret)
 			ret: stop recursive subclass processing.
 		"""
 
+	@property
+	def app(self) -> SCApp | None:
+		return (self.appref() if (self.appref is not None) else None)
+
+	@app.setter
+	def app(self, app: SCApp | None):
+		self.appref = (weakref.ref(app) if (app is not None) else None)
+
+	@property
+	def _scheduler(self) -> SCApp | None:
+		return (app if (isinstance(app := self.app, SCApp)) else None)
+
+	@property
+	def parent(self) -> SCWindow | None:
+		""" Window this view was added to. """
+
+		return (self.parentref() if (self.parentref is not None) else None)
+
+	@parent.setter
+	def parent(self, parent: SCWindow | None):
+		self.parentref = (weakref.ref(parent) if (parent is not None) else None)
+
+class SCView(SCViewBase, TypeInit):
+	# public:
+	width: int
+	height: int
+	erase: bool = True
+	poll: bool = False; '`.proc()\' on every pass of the main loop'
+	transparent: bool
+	touched: bool
+	died: bool
+
+	# private:
+	appref: weakref.ref | None = None
+	parentref: weakref.ref | None = None
+
+	# properties:
+	app: SCApp
+	parent: SCWindow
+
+class SCSlotsView(SCViewBase):
+	""" `SCView' without a per-instance `__dict__', for leaf widgets that are created in large numbers, like `SCLabelView'.
+	The `SCView' hierarchy keeps its `__dict__', so that subclasses can add attributes freely.
+	Subclasses must list their own attributes in `__slots__'.
+	"""
+
+	__slots__ = ('width', 'height', 'transparent', 'touched', 'died', 'appref', 'parentref', '__weakref__')
+
+	erase = True
+	poll = False
+
+	def __init__(self):
+		self.width = self.height = 0
+		self.transparent = self.touched = self.died = False
+		self.appref = self.parentref = None
+
 class SCTestView(SCView):
 	char: str
 
@@ -306,6 +1879,30 @@ class SCTestView(SCView):
 			except curses.error: pass
 		return ret
 
+class SCLabelView(SCSlotsView):
+	""" A line of text, e.g. a dialog caption or a row of a form. """
+
+	__slots__ = ('text', 'attr')
+
+	def __init__(self, text: str = '', attr: int | SCStyle = curses.A_NORMAL):
+		super().__init__()
+		self.text, self.attr = text, attr
+
+	def set(self, text: str, attr: int | SCStyle | None = None):
+		""" Change the text (and `attr' if given), redrawing only if it differs. """
+
+		if (attr is None): attr = self.attr
+		if (text == self.text and attr == self.attr): return
+		self.text, self.attr = text, attr
+		self.touch()
+
+	def draw(self, stdscr) -> bool -- ret:
+		ret = super().draw(stdscr)
+		if (not ret):
+			try: stdscr.addstr(0, 0, self.text[:self.width], int(self.attr))
+			except curses.error: pass
+		return ret
+
 class SCWindowView(SCView):
 	win: SCWindow
 
@@ -315,21 +1912,14 @@ class SCWindowView(SCView):
 
 	def init(self):
 		super().init()
-		self.win.app = self.app
-		self.win.stdscr = curses.newpad(1, 1)
+		self.win.app, self.win.owner = self.app, self
+		self.win.stdscr = self.app.newpad(1, 1)
 		self.win.init()
 
 	def die(self):
 		super().die()
 		self.win.die()
 
-	def proc(self) -> bool -- ret:
-		ret = super().proc()
-		if (ret):
-			self.win.proc()
-			if (self.win.touched): self.touch()
-		return ret
-
 	def draw(self, stdscr) -> bool -- ret:
 		ret = super().draw(stdscr)
 		if (not ret):
@@ -367,8 +1957,8 @@ class SCSplitView(SCView, ABCTypeInit):
 	def init(self):
 		super().init()
 		for win in self.p:
-			win.app = self.app
-			win.stdscr = curses.newpad(1, 1)
+			win.app, win.owner = self.app, self
+			win.stdscr = self.app.newpad(1, 1)
 			win.init()
 
 	def die(self):
@@ -376,14 +1966,6 @@ class SCSplitView(SCView, ABCTypeInit):
 		for win in self.p:
 			win.die()
 
-	def proc(self) -> bool -- ret:
-		ret = super().proc()
-		if (not ret):
-			for win in self.p:
-				win.proc()
-				if (win.touched): self.touch()
-		return ret
-
 	@abc.abstractmethod
 	def draw(self, stdscr) -> bool -- ret:
 		return super().draw(stdscr)
@@ -428,26 +2010,237 @@ class SCHSplitView(SCSplitView):
 				self.p[i].loop(0, 0, 0, sl[i], self.height, sl[i+1])
 		return ret
 
+class SCObservableList(collections.abc.MutableSequence):
+	""" List that reports its changes to subscribers as `listener(kind, start, stop, delta)':
+	items `[start, stop)' were replaced by `stop-start+delta' new ones.
+	`kind' is one of 'insert', 'delete', 'update' (same length) or 'replace'.
+	Changes made inside `with l.batch():' are reported when it ends, in order,
+	with changes that overlap or touch the previous one merged into a single range.
+	"""
+
+	# public:
+	data: list
+
+	# private:
+	listeners: list[weakref.ref | callable]
+	batching: int
+	pending: list[list]; '[kind, start, new stop, delta] of each change'
+
+	def __init__(self, iterable=()):
+		self.data = list(iterable)
+		self.listeners = list()
+		self.batching = 0
+		self.pending = list()
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({self.data!r})"
+
+	def __eq__(self, other):
+		return (self.data == (other.data if (isinstance(other, SCObservableList)) else other))
+
+	def __len__(self):
+		return len(self.data)
+
+	def __getitem__(self, i):
+		return self.data[i]
+
+	def __setitem__(self, i, x):
+		if (not isinstance(i, slice)):
+			i = range(len(self.data))[i]
+			self.data[i] = x
+			self.changed('update', i, i+1, 0)
+			return
+
+		start, stop, step = i.indices(len(self.data))
+		if (step != 1):
+			r = range(start, stop, step)
+			self.data[i] = x
+			if (r): self.changed('update', min(r), max(r)+1, 0)
+			return
+
+		x = list(x)
+		stop = max(start, stop)
+		self.data[start:stop] = x
+		delta = (len(x) - (stop - start))
+		if (not delta): kind = 'update'
+		elif (not x): kind = 'delete'
+		elif (start == stop): kind = 'insert'
+		else: kind = 'replace'
+		if (x or delta): self.changed(kind, start, stop, delta)
+
+	def __delitem__(self, i):
+		if (not isinstance(i, slice)):
+			i = range(len(self.data))[i]
+			del self.data[i]
+			self.changed('delete', i, i+1, -1)
+			return
+
+		r = range(*i.indices(len(self.data)))
+		del self.data[i]
+		if (not r): return
+		if (r.step == 1): self.changed('delete', r.start, r.stop, -len(r))
+		else: self.changed('replace', min(r), max(r)+1, -len(r))
+
+	def insert(self, i, x):
+		n = len(self.data)
+		i = max(0, min(n, (i if (i >= 0) else n+i)))
+		self.data.insert(i, x)
+		self.changed('insert', i, i, 1)
+
+	def extend(self, iterable):
+		x = list(iterable)
+		if (not x): return
+		n = len(self.data)
+		self.data.extend(x)
+		self.changed('insert', n, n, len(x))
+
+	def clear(self):
+		n = len(self.data)
+		self.data.clear()
+		if (n): self.changed('delete', 0, n, -n)
+
+	def sort(self, **kwargs):
+		self.data.sort(**kwargs)
+		if (self.data): self.changed('update', 0, len(self.data), 0)
+
+	def reverse(self):
+		self.data.reverse()
+		if (self.data): self.changed('update', 0, len(self.data), 0)
+
+	def subscribe(self, listener: callable):
+		""" Add `listener'. Bound methods are held weakly. """
+
+		self.listeners.append(weakref.WeakMethod(listener) if (hasattr(listener, '__self__')) else listener)
+
+	def unsubscribe(self, listener: callable):
+		for i in self.listeners[:]:
+			if ((i() if (isinstance(i, weakref.WeakMethod)) else i) == listener): self.listeners.remove(i)
+
+	@contextlib.contextmanager
+	def batch(self):
+		self.batching += 1
+		try: yield self
+		finally:
+			self.batching -= 1
+			if (not self.batching):
+				pending, self.pending = self.pending, list()
+				for kind, start, stop, delta in pending:
+					self.notify(kind, start, stop - delta, delta)
+
+	def changed(self, kind: str, start: int, stop: int, delta: int):
+		if (not self.batching): self.notify(kind, start, stop, delta); return
+
+		if (not self.pending or start > (p := self.pending[-1])[2] or stop < p[1]):  # disjoint from the previous change
+			self.pending.append([kind, start, stop + delta, delta])
+			return
+
+		start, stop, delta = min(p[1], start), (max(p[2], stop) + delta), (p[3] + delta)
+		if (kind == p[0] == 'update'): pass
+		elif (stop - delta == start): kind = 'insert'
+		elif (stop == start): kind = 'delete'
+		else: kind = 'replace'
+		p[:] = (kind, start, stop, delta)
+
+	def notify(self, kind: str, start: int, stop: int, delta: int):
+		for i in self.listeners[:]:
+			if (isinstance(i, weakref.WeakMethod)):
+				if ((f := i()) is None): self.listeners.remove(i); continue
+			else: f = i
+			f(kind, start, stop, delta)
+
 class SCListView(SCView):
 	# public:
-	l: list
 	t: int; 'view offset'
 
+	# private:
+	model: list | None = None
+	damage: set[int] | None = None; 'rows to redraw instead of the whole view'
+
+	# properties:
+	l: list
+
 	def __init__(self, l):
 		super().__init__()
 		self.l = l
 
+	def die(self):
+		super().die()
+		if (isinstance(self.model, SCObservableList)): self.model.unsubscribe(self.listChanged)
+
 	def draw(self, stdscr) -> bool -- ret:
-		ret = super().draw(stdscr)
+		damage, self.damage = self.damage, None
+		if (damage is not None and self.touched and stdscr.getmaxyx() == (self.height, self.width)):
+			self.touched = False
+			ret, rows = False, sorted(damage)
+		else:
+			ret = super().draw(stdscr)
+			rows = range(self.t, min(self.t + self.height, len(self.l)))
+
 		if (not ret):
-			for i in range(self.t, min(self.t + self.height, len(self.l))):
-				ret, items = self.item(i)
+			for i in rows:
 				stdscr.move(i-self.t, 0)
+				if (damage is not None):
+					stdscr.clrtoeol()
+					if (i >= len(self.l)): continue
+				ret, items = self.item(i)
 				for text, attrs in items:
 					try: stdscr.addstr(text, attrs)
 					except curses.error: pass  # last character of the screen
 		return ret
 
+	def touch(self):
+		super().touch()
+		self.damage = None
+
+	def touchRows(self, start: int, stop: int):
+		""" Redraw only rows `[start, stop)' of `self.l' on the next frame, if any of them are visible. """
+
+		start, stop = max(start, self.t), min(stop, self.t + self.height)
+		if (start >= stop): return
+		if (self.touched and self.damage is None): return  # full redraw pending
+
+		if (self.damage is None): self.damage = set()
+		self.damage.update(range(start, stop))
+		if (not self.touched): self._touchParent()
+		self.touched = True
+
+	def batch(self):
+		""" Context manager reporting changes to `self.l' made inside it at once, if it is an `SCObservableList'. """
+
+		return (self.l.batch() if (isinstance(self.l, SCObservableList)) else contextlib.nullcontext(self.l))
+
+	def listChanged(self, kind: str, start: int, stop: int, delta: int) -> bool -- ret:
+		""" `self.l' (an `SCObservableList') changed, see `SCObservableList'.
+		Return: (ret)
+			ret: stop recursive subclass processing.
+		"""
+
+		t = self.t
+		if (start < t): self.t = self._shiftIndex(t, start, stop, delta)
+		if (delta and self.damage):  # keep the rows to redraw on the same items
+			self.damage = {j for i in self.damage if self.t <= (j := self._shiftIndex(i, start, stop, delta)) < self.t + self.height}
+
+		if (start < t):
+			if (stop > t): self.touch()  # the top of the view changed
+		elif (delta): self.touchRows(start, self.t + self.height)
+		else: self.touchRows(start, stop)
+
+	@staticmethod
+	def _shiftIndex(i: int, start: int, stop: int, delta: int) -> int:
+		if (i < start): return i
+		if (i >= stop): return (i + delta)
+		return min(i, max(start, stop + delta - 1))
+
+	@property
+	def l(self) -> list:
+		return self.model
+
+	@l.setter
+	def l(self, l: list):
+		if (isinstance(self.model, SCObservableList)): self.model.unsubscribe(self.listChanged)
+		self.model = l
+		if (isinstance(l, SCObservableList)): l.subscribe(self.listChanged)
+
 	def key(self, c: SCKey) -> bool -- ret:
 		if (c == curses.KEY_UP):
 			self.t -= 1
@@ -466,7 +2259,24 @@ class SCListView(SCView):
 		"""
 
 		if (not 0 <= i < len(self.l)): return (True, [])
-		return (False, [(str(self.l[i]), int())])
+		return (False, [(self.itemText(i), int())])
+
+	def itemText(self, i) -> str:
+		""" Return `self.decode(self.l[i])', through the app's `render_cache' for value-hashable items. """
+
+		x = self.l[i]
+		cache = getattr(self.app, 'render_cache', None)  # `None' unless drawn by an `SCApp'
+		if (cache is None or type(x).__hash__ in (None, object.__hash__)): return self.decode(x)
+
+		k = (type(self).decode, type(x), x)
+		try: return cache[k]
+		except KeyError: r = cache[k] = self.decode(x)
+		return r
+
+	def decode(self, x) -> str:
+		""" Return text for list item `x'. `bytes' items (e.g. rows from an `SCWorkerPool') are UTF-8. """
+
+		return (x.decode('utf-8', 'replace') if (isinstance(x, bytes)) else str(x))
 
 class SCLoadingListView(SCListView):
 	class LoadItem(Slots):
@@ -502,7 +2312,8 @@ class SCLoadingListView(SCListView):
 				ret = True
 			elif (self.loading):
 				self.loading = False
-				self.load()
+				with self.batch():
+					self.load()
 		return ret
 
 	def load(self) -> bool -- ret:
@@ -523,6 +2334,39 @@ class SCLoadingListView(SCListView):
 		self.to_load = True
 		self.touch()
 
+	def loadFrom(self, pool: SCWorkerPool, fn, *args) -> SCWorkerPool.Task:
+		""" Load items in a worker process from `.load()': stream the rows yielded by `fn(*args)' (see `SCWorkerPool.submit()'),
+		then append `LoadItem(True, result)' with its return value, or `LoadItem(False)' if it is `None'.
+		"""
+
+		return self.loadFromAll(pool, fn, (args,))[0]
+
+	def loadFromAll(self, pool: SCWorkerPool, fn, argss) -> list[SCWorkerPool.Task]:
+		""" Fan a load out over `pool': run `fn(*args)' for each tuple in `argss' in its own worker.
+		Rows are appended in task order: the first unfinished task streams into the list, later ones are buffered until it is done.
+		A single `LoadItem' is appended after the last task, with the return value of the last task (see `.loadFrom()').
+		"""
+
+		tasks, results, head = [], [], 0
+
+		def done(i, r):
+			nonlocal head
+			results[i] = (True, r)
+			while (head < len(tasks)):
+				task = tasks[head]
+				if (task.into is not self.l):
+					self.l.extend(task.into)
+					task.into = self.l
+				if (not results[head][0]): return
+				head += 1
+			r = results[-1][1]
+			self.l.append(self.LoadItem(r is not None, r))
+
+		for i, args in enumerate(argss):
+			results.append((False, None))
+			tasks.append(pool.submit(fn, *args, into=(self.l if (i == 0) else []), view=self, done=functools.partial(done, i)))
+		return tasks
+
 class SCSelectingListView(SCListView):
 	class EmptyItem(Slots):
 		def __str__(self):
@@ -531,6 +2375,9 @@ class SCSelectingListView(SCListView):
 	# public:
 	n: int; 'highlighted line'
 	s: int; 'selected line'
+	multiselect: bool = False; 'S-Up/S-Down extend, Space toggles, ^A selects all'
+	selection: SCIntervalSet; 'multi-selected lines'
+	anchor: int = -1; 'start of the S-Up/S-Down range'
 
 	def __init__(self, l):
 		super().__init__(l)
@@ -541,6 +2388,24 @@ class SCSelectingListView(SCListView):
 	#	return super().draw(stdscr)
 
 	def key(self, c: SCKey) -> bool -- ret:
+		if (self.multiselect):
+			if (c in (curses.KEY_SR, curses.KEY_SF)):
+				n, anchor = self.n, (self.anchor if (self.anchor >= 0) else self.n)
+				self.key(SCKey(curses.KEY_UP if (c == curses.KEY_SR) else curses.KEY_DOWN))
+				self.anchor = anchor
+				self.selection.discard(min(anchor, n), max(anchor, n)+1)
+				self.selectRange(min(anchor, self.n), max(anchor, self.n)+1)
+				return True
+			self.anchor = -1
+			if (c == ' '):
+				if (not self.is_empty(self.n)):
+					self.selection.toggle(self.n)
+					self.touch()
+				return True
+			elif (c == '^A'):
+				self.selectAll()
+				return True
+
 		if (c == curses.KEY_UP):
 			n = self.n
 			while (n > 0):
@@ -600,11 +2465,28 @@ class SCSelectingListView(SCListView):
 		if (not 0 <= i < len(self.l)): return True
 		return isinstance(self.l[i], self.EmptyItem)
 
+	def listChanged(self, kind: str, start: int, stop: int, delta: int) -> bool -- ret:
+		t, n, s = self.t, self.n, self.s
+		ret = super().listChanged(kind, start, stop, delta)
+		if (not ret):
+			if (start <= self.s < stop and self.s >= stop + delta): self.s = -1  # selected item is gone
+			elif (self.s >= 0): self.s = self._shiftIndex(self.s, start, stop, delta)
+			if (self.n < len(self.l) - delta): self.n = self._shiftIndex(self.n, start, stop, delta)
+			self.n = max(0, min(self.n, len(self.l)-1))
+			if (kind != 'update'): self.selection.shift(start, stop, delta)
+			if (self.anchor >= 0): self.anchor = self._shiftIndex(self.anchor, start, stop, delta)
+
+			for old, new in ((n, self.n), (s, self.s)):
+				if (new == old): continue
+				if (old >= 0): self.touchRows(old - t + self.t, old - t + self.t + 1)  # the screen row it was drawn on
+				if (new >= 0): self.touchRows(new, new+1)
+		return ret
+
 	def item(self, i):
 		ret, items = super().item(i)
 		if (not ret):
 			for ii, (text, attrs) in enumerate(items):
-				attrs |= (curses.A_STANDOUT*(i==self.n) | curses.A_BOLD*(i==self.s))
+				attrs |= (curses.A_STANDOUT*(i==self.n) | curses.A_BOLD*(i==self.s or i in self.selection))
 				items[ii] = (text, attrs)
 		return (ret, items)
 
@@ -645,8 +2527,24 @@ class SCSelectingListView(SCListView):
 
 	def unselect(self):
 		self.s = -1
+		self.selection.clear()
 		self.touch()
 
+	def selectRange(self, start, stop):
+		""" Add lines `[start, stop)' to `self.selection'. """
+
+		self.selection.add(max(start, 0), min(stop, len(self.l)))
+		self.touch()
+
+	def selectAll(self):
+		self.selectRange(0, len(self.l))
+
+	def selected(self):
+		""" Iterate over multi-selected items. """
+
+		for i in self.selection:
+			if (not self.is_empty(i)): yield self.l[i]
+
 class SCLoadingSelectingListView(SCLoadingListView, SCSelectingListView):
 	def key(self, c: SCKey) -> bool -- ret:
 		if (c == curses.KEY_DOWN):
@@ -706,27 +2604,262 @@ class SCLoadingSelectingListView(SCLoadingListView, SCSelectingListView):
 				ret = True
 		return ret
 
+class SCTreeView(SCSelectingListView):
+	""" Selecting list of the visible nodes of a lazily loaded tree.
+	Each node keeps the visible row counts of its children's subtrees in an `SCFenwickTree',
+	so expanding or collapsing a subtree and finding the node at a row are O(depth * log(n)).
+	Children are loaded by `.loadChildren()' when a node is first expanded.
+	"""
+
+	LoadItem = SCLoadingListView.LoadItem
+
+	class Node(Slots):
+		# public:
+		value: ...
+		parent: SCTreeView.Node | None
+		index: int; 'position among siblings'
+		depth: int
+		expanded: bool
+		has_children: bool
+		children: list[SCTreeView.Node] | None; '`None\' until loaded'
+
+		# private:
+		sizes: SCFenwickTree | None; 'visible rows of each child subtree'
+
+		def __init__(self, value, parent=None, index=0, *, has_children=True):
+			self.value, self.parent, self.index = value, parent, index
+			self.depth = ((parent.depth + 1) if (parent is not None) else -1)
+			self.expanded = False
+			self.has_children = has_children
+			self.children = self.sizes = None
+
+		def __repr__(self):
+			return f"<{self.__class__.__qualname__} {self.value!r}>"
+
+		@property
+		def size(self) -> int:
+			""" Number of rows taken by this node and its visible descendants. """
+
+			return (1 + (self.sizes.total if (self.expanded and self.sizes is not None) else 0))
+
+	class Rows(collections.abc.Sequence):
+		""" Sequence of the visible nodes of a tree, in display order. """
+
+		def __init__(self, root):
+			self.root = root
+
+		def __len__(self):
+			return (self.root.sizes.total if (self.root.expanded and self.root.sizes is not None) else 0)
+
+		def __getitem__(self, i):
+			if (isinstance(i, slice)): return [self[j] for j in range(*i.indices(len(self)))]
+
+			n = len(self)
+			if (i < 0): i += n
+			if (not 0 <= i < n): raise IndexError(i)
+
+			node = self.root
+			while (True):
+				ii, i = node.sizes.find(i)
+				node = node.children[ii]
+				if (not i): return node
+				i -= 1
+
+	# public:
+	root: '# SCTreeView.Node'
+	indent: int = 2
+
+	def __init__(self, roots=None):
+		""" `roots' are the top level values, or `None' to load them with `.loadChildren()' on `.init()'. """
+
+		self.root = self.Node(None)
+		super().__init__(self.Rows(self.root))
+		self.root.expanded = True
+		if (roots is not None): self.addChildren(self.root, roots)
+
+	def init(self):
+		super().init()
+		if (self.root.children is None): self.addChildren(self.root, self.loadChildren(self.root))
+
+	def key(self, c: SCKey) -> bool -- ret:
+		if (c == curses.KEY_RIGHT):
+			if (not self.is_empty(self.n)):
+				node = self.l[self.n]
+				if (not node.expanded): self.expand(node)
+				elif (node.children): self.highlightAndScroll(self.n+1)
+		elif (c == curses.KEY_LEFT):
+			if (not self.is_empty(self.n)):
+				node = self.l[self.n]
+				if (node.expanded and node.children is not None): self.collapse(node)
+				elif (node.parent is not self.root): self.highlightAndScroll(self.rowOf(node.parent))
+		else: return super().key(c)
+		return True
+
+	def itemText(self, i) -> str:
+		node = self.l[i]
+		if (isinstance(node.value, self.LoadItem)): text, mark = "Load more...", ' '
+		else: text, mark = self.nodeText(node), ('-' if (node.expanded) else '+' if (node.has_children) else ' ')
+		return f"{' '*(self.indent*node.depth)}{mark} {text}"
+
+	def item(self, i):
+		ret, items = super().item(i)
+		if (not ret and isinstance(self.l[i].value, self.LoadItem)):
+			items = [(text, attrs | curses.A_DIM) for text, attrs in items]
+		return (ret, items)
+
+	def select(self) -> bool -- ret:
+		if (not self.is_empty(self.n) and isinstance((node := self.l[self.n]).value, self.LoadItem)):
+			self.addChildren(node.parent, self.loadChildren(node.parent, node.value.next_value))
+			return True
+		return super().select()
+
+	def nodeText(self, node: SCTreeView.Node) -> str:
+		""" Return text for `node'. """
+
+		return str(node.value)
+
+	def loadChildren(self, node: SCTreeView.Node, next_value=None) -> list:
+		""" Return child values of `node' (`.root' for the top level).
+		To load them in parts, end the list with a `LoadItem(has_more, next_value)':
+		selecting it calls `.loadChildren(node, next_value)' for the rest.
+		"""
+
+		return []
+
+	def hasChildren(self, value) -> bool:
+		""" Whether a node for `value' may have children, i.e. can be expanded. """
+
+		return True
+
+	def addChildren(self, node: SCTreeView.Node, values):
+		""" Append child nodes for `values' to `node', replacing its pending `LoadItem' if any. """
+
+		if (node.children is None): node.children, node.sizes = list(), SCFenwickTree()
+		children, sizes = node.children, node.sizes
+		old = keep = sizes.total
+		if (children and isinstance(children[-1].value, self.LoadItem)):
+			children.pop()
+			keep -= sizes.pop()
+
+		for v in values:
+			if (isinstance(v, self.LoadItem)):
+				if (not v.has_more): continue
+				child = self.Node(v, node, len(children), has_children=False)
+			else: child = self.Node(v, node, len(children), has_children=self.hasChildren(v))
+			children.append(child)
+			sizes.append(1)
+
+		if (not children): node.has_children = False
+		if (node.expanded): self._resized(node, old, sizes.total, keep)
+
+	def expand(self, node: SCTreeView.Node):
+		if (node.expanded or not node.has_children): return
+		if (node.children is None): self.addChildren(node, self.loadChildren(node))
+		if (not node.children):
+			node.has_children = False
+			self._touchNode(node)
+			return
+		node.expanded = True
+		self._resized(node, 0, node.sizes.total)
+
+	def collapse(self, node: SCTreeView.Node):
+		if (not node.expanded): return
+		node.expanded = False
+		self._resized(node, (node.sizes.total if (node.sizes is not None) else 0), 0)
+
+	def toggle(self, node: SCTreeView.Node):
+		if (node.expanded): self.collapse(node)
+		else: self.expand(node)
+
+	def reload(self, node: SCTreeView.Node | None = None):
+		""" Drop loaded children of `node' (or of the whole tree) and load them again if it was expanded. """
+
+		if (node is None): node = self.root
+		expanded = node.expanded
+		self.collapse(node)
+		node.children = node.sizes = None
+		node.has_children = True
+		if (expanded): self.expand(node)
+
+	def rowOf(self, node: SCTreeView.Node) -> int | None:
+		""" Return row of `node', `-1' for `.root', or `None' if it is hidden under a collapsed node. """
+
+		row = -1
+		while ((parent := node.parent) is not None):
+			if (not parent.expanded): return None
+			row += (1 + parent.sizes.prefix(node.index))
+			node = parent
+		return row
+
+	def _resized(self, node: SCTreeView.Node, old: int, new: int, keep: int = 0):
+		""" Rows under `node' changed from `old' to `new', the first `keep' of them are the same. """
+
+		delta = (new - old)
+		child = node
+		while (delta and (parent := child.parent) is not None):
+			parent.sizes.add(child.index, delta)
+			if (not parent.expanded): break
+			child = parent
+
+		if ((row := self.rowOf(node)) is None): return
+		if (row >= 0): self.touchRows(row, row+1)
+		if (old == new == keep): return
+		kind = ('insert' if (old == keep) else 'delete' if (new == keep) else 'replace')
+		self.listChanged(kind, row+1 + keep, row+1 + old, delta)
+
+	def _touchNode(self, node: SCTreeView.Node):
+		if ((row := self.rowOf(node)) is not None and row >= 0): self.touchRows(row, row+1)
+
 class SCTextBox(SCView):
 	# public:
 	tabsize: 8
-	lines: lambda: Sdict(str)
+	lines: lambda: collections.defaultdict(str); 'call `._lineChanged()\' after editing a line in place, `._linesReset()\' after adding or removing lines directly'
 	line: int
 	col: int
 	yoff: int
+	find_re: re.Pattern | None = None
+	find_regex: bool; '`.replaceAll()\' expands group references'
+	find_attr: int | SCStyle = (curses.A_BOLD | curses.A_UNDERLINE)
+	find_chunk: int = 1024; 'lines scanned per `.proc()\''
+	find_count: int; 'matches found so far'
+
+	# private:
+	find_cache: dict[int, tuple[tuple[int, int]]]; 'line -> match spans'
+	find_dirty: set[int]; 'edited lines to rescan'
+	find_pos: int; 'background scan position'
+	find_hits: list[int]; 'sorted lines with matches'
+	find_pending: tuple | None = None; '(line, col, step, cursor) of a search waiting for the scan'
+	maxline: int; 'highest line number in `lines\', kept by the edit helpers'
+	wrap: SCFenwickTree | None = None; 'screen rows per line'
+	wrap_adv: list[int]; 'display width per line'
+	wrap_width: int
+	wrap_gutter: int
 
 	# properties:
 	text: str
 	nlines: int
 	cline: str
+	gutter: int
 
 	def init(self):
 		super().init()
 		self.app.stdscr.leaveok(False)
 
+	def proc(self) -> bool -- ret:
+		ret = super().proc()
+		if (not ret and self.find_re is not None and self._findScan()): self.wakeup()
+		return ret
+
 	def _drawLine(self, stdscr, ln: int, l: str, *, x: int = 0, y: int = 0):
+		marks = set()
+		if (self.find_re is not None):
+			for a, b in self._findSpans(ln):
+				marks.update(range(a, b))
+
+		find_attr = int(self.find_attr)
 		ii = None
 		for ii, c in enumerate(l):
-			try: stdscr.addch(y, x, c if (c != '\t') else ' ', curses.A_STANDOUT*(ln == self.line and ii == self.col))
+			try: stdscr.addch(y, x, c if (c != '\t') else ' ', curses.A_STANDOUT*(ln == self.line and ii == self.col) | find_attr*(ii in marks))
 			except curses.error: pass  # last character of the screen
 			x += (self.tabsize if (c == '\t') else 1)
 			if (x >= self.width): y += 1; x = 0
@@ -741,21 +2874,19 @@ class SCTextBox(SCView):
 	def draw(self, stdscr) -> bool -- ret:
 		ret = super().draw(stdscr)
 		if (not ret):
-			x = y = pln = int()
-			y -= self.yoff
-
-			ln = int()
-			for ln, l in sorted(self.lines.items()):
-				y += (ln - pln)
-				if (y >= self.height): break
-
-				x, y = self._drawLine(stdscr, ln, l, y=y)
-				if (y >= self.height): break
+			wrap = self._wrapLayout()
+			ln, y = wrap.find(self.yoff)
+			y = -y
 
-				pln = ln
+			while (ln < len(wrap) and y < self.height):
+				x, y = self._drawLine(stdscr, ln, self.lines.get(ln, ''), y=y)
+				ln += 1
+				y += 1
 
-			if (ln < self.line and self.line < self.height and x <= self.col and self.col < self.width):
-				stdscr.addch(y, min(self.col, len(self.lines[self.line])), ' ', curses.A_STANDOUT | curses.A_DIM)
+			cy = (self._cursorRow() - self.yoff)
+			if (self.line >= len(wrap) and 0 <= cy < self.height):
+				try: stdscr.addch(cy, min(self.gutter, self.width-1), ' ', curses.A_STANDOUT | curses.A_DIM)
+				except curses.error: pass
 
 			self.ycnt = y
 		return ret
@@ -803,78 +2934,87 @@ class SCTextBox(SCView):
 			if (self.col < 0):
 				if (self.line > 0):
 					self.line -= 1
-					if (self.line < self.yoff): self.yoff -= 1
 					self.col = len(self.cline)
 				else: self.col = 0
+			self.scrollToCursor()
 			self.touch()
 		elif (ch == curses.KEY_RIGHT):
 			if (self.line <= self.nlines):
 				self.col += 1
 				if (self.col > len(self.cline) and self.line < self.nlines):
 					self.line += 1
-					if (self.line >= self.yoff + self.height): self.yoff += 1
 					self.col = 0
+				self.scrollToCursor()
 				self.touch()
 		elif (ch == curses.KEY_UP):
 			if (self.line > 0):
 				self.line -= 1
-				if (self.line < self.yoff): self.yoff -= 1
+				self.scrollToCursor()
 				self.touch()
 		elif (ch == curses.KEY_DOWN):
 			if (self.line < self.nlines):
 				self.line += 1
-				if (self.line >= self.yoff + self.height): self.yoff += 1
+				self.scrollToCursor()
 				self.touch()
 		elif (ch == curses.KEY_HOME):
 			self.col = 0
+			self.scrollToCursor()
 			self.touch()
 		elif (ch == curses.KEY_END):
 			self.col = len(self.cline)
+			self.scrollToCursor()
 			self.touch()
 		elif (ch == curses.KEY_PPAGE):
-			if (self.line - self.height > 0):
-				self.line -= self.height
-				self.yoff -= self.height
+			row = self._cursorRow()
+			if (row - self.height > 0):
+				self.line = self._wrapLayout().find(row - self.height)[0]
+				self.yoff = max(self.yoff - self.height, 0)
 			elif (self.line == 0): self.col = 0
 			else: self.line = self.yoff = 0
+			self.scrollToCursor()
 			self.touch()
 		elif (ch == curses.KEY_NPAGE):
-			if (self.line + self.height < self.nlines):
-				self.line += self.height
-				self.yoff += self.height
+			row, wrap = self._cursorRow(), self._wrapLayout()
+			if (row + self.height < wrap.prefix(self.nlines)):
+				self.line = wrap.find(row + self.height)[0]
+				self.yoff = min(self.yoff + self.height, wrap.total-1)
 			elif (self.line == self.nlines): self.col = len(self.cline)
 			else: self.line = self.nlines#+1
+			self.scrollToCursor()
 			self.touch()
 		elif (ch == 536):  # ^Home
 			self.line = self.col = self.yoff = 0
 			self.touch()
 		elif (ch == 531):  # ^End
 			self.line = self.nlines
-			self.yoff = max(self.line - self.height + 1, 0)
 			self.col = len(self.cline)
+			self.yoff = max(self._cursorRow() - self.height + 1, 0)
 			self.touch()
 		elif (ch == 565):  # M-Up
 			if (self.yoff > 0):
 				self.yoff -= 1
 				self.touch()
 		elif (ch == 524):  # M-Down
-			if (self.yoff < self.nlines):
+			if (self.yoff < self._wrapLayout().total-1):
 				self.yoff += 1
 				self.touch()
 		elif (ch in (curses.KEY_BACKSPACE, curses.ascii.BS, curses.ascii.DEL)):
 			if (self.cline):
 				self.col = min(self.col-1, len(self.cline))
 				if (self.col >= 0): self.cline = (self.cline[:self.col] + self.cline[self.col+1:])
+				elif (self.line == 0): self.col = 0
 				else:
 					line = self.cline; del self.cline
 					self.line -= 1
 					self.col = len(self.cline)
 					self.cline += line
+				self.scrollToCursor()
 				self.touch()
 			else:
 				del self.cline
 				self.line = max(0, self.line-1)
 				self.col = len(self.cline)
+				self.scrollToCursor()
 				self.touch()
 		elif (ch in (curses.KEY_DC, curses.ascii.DEL)):
 			if (self.cline):
@@ -886,34 +3026,317 @@ class SCTextBox(SCView):
 				del self.cline
 				self.line = max(0, self.line-1)
 				self.col = len(self.cline)
+				self.scrollToCursor()
 				self.touch()
 		elif (ch in (curses.KEY_ENTER, curses.ascii.NL)):
 			for ii, i in sorted(self.lines.items(), reverse=True):
 				if (ii <= self.line): break
 				self.lines[ii+1] = i
+			self._linesMoved(self.line, +1)
 			cline = self.cline
 			self.cline = cline[:self.col]
 			self.line += 1
 			self.cline = cline[self.col:]
 			self.col = 0
+			self.scrollToCursor()
 			self.touch()
 		elif (ch == '^K'):
 			del self.cline
-			if (self.line <= self.yoff): self.yoff -= 1
 			if (not self.cline):
 				self.line = self.nlines
 				self.col = len(self.cline)
+			self.scrollToCursor()
 			self.touch()
+		elif (ch == curses.KEY_F3 and self.find_re is not None):
+			self.findNext()
+		elif (ch == curses.KEY_F15 and self.find_re is not None):  # S-F3
+			self.findPrev()
 		elif (ch.ch.isprintable() or ch == '\t'):
 			self.cline = (self.cline[:self.col] + ch.ch + self.cline[self.col:])
 			self.col += 1 #(self.col//8*8 if (ch == '\t') else 1)
+			self.scrollToCursor()
 			self.touch()
 		else: return super().key(c)
 		return True
 
+	def find(self, pattern: str | re.Pattern, *, regex: bool = False, icase: bool = False) -> bool:
+		""" Start searching for `pattern' and move the cursor to the first match at or after it.
+		Matching lines are scanned in background by `.proc()', see `.found()'.
+		Searches only look at the lines scanned so far; if the match is not scanned yet,
+		the cursor is moved when the scan reaches it (unless it was moved meanwhile).
+		Return: whether the cursor was moved right away.
+		"""
+
+		if (not pattern): self.unfind(); return False
+		self.find_regex = (regex or isinstance(pattern, re.Pattern))
+		if (not isinstance(pattern, re.Pattern)): pattern = re.compile(pattern if (regex) else re.escape(pattern), re.I*icase)
+		self.find_re = pattern
+		self._findReset()
+		return self._findFrom(self.line, self.col)
+
+	def unfind(self):
+		self.find_re = None
+		self._findReset()
+
+	def findNext(self) -> bool:
+		if (self.find_re is None): return False
+		return self._findFrom(self.line, self.col+1)
+
+	def findPrev(self) -> bool:
+		if (self.find_re is None): return False
+		return self._findFrom(self.line, self.col, -1)
+
+	def replaceAll(self, repl: str) -> int:
+		""" Replace all matches of the current search with `repl' as a single edit.
+		`repl' is a `re.sub()' template only if the search is a regex.
+		Return: number of replacements made.
+		"""
+
+		if (self.find_re is None): return 0
+
+		count = int()
+		def sub(m):
+			nonlocal count
+			if (m.end() == m.start()): return ''  # not found either, see `._findSpans()'
+			count += 1
+			return (m.expand(repl) if (self.find_regex) else repl)
+
+		changed = dict()
+		for ln, l in self.lines.items():
+			n = count
+			r = self.find_re.sub(sub, l)
+			if (count != n): changed[ln] = r
+
+		if (any('\n' in i for i in changed.values())):
+			lines, off = dict(), int()
+			for ln, l in sorted(self.lines.items()):
+				for ii, i in enumerate(changed.get(ln, l).split('\n')):
+					lines[ln+off+ii] = i
+				off += ii
+			self.lines.clear()
+			self.lines.update(lines)
+			self._linesReset()
+		else:
+			self.lines.update(changed)
+			for ln in changed:
+				self._lineChanged(ln)
+
+		self.col = min(self.col, len(self.cline))
+		self.touch()
+		return count
+
+	def found(self, ln: int, spans: tuple[tuple[int, int]]) -> bool -- ret:
+		""" Matches found on line `ln' by the background scan.
+		Return: (ret)
+			ret: stop recursive subclass processing.
+		"""
+
+	def scrollToCursor(self):
+		row = self._cursorRow()
+
+		if (row < self.yoff):
+			self.yoff = row
+			self.touch()
+
+		if (row >= self.yoff + self.height):
+			self.yoff = (row - self.height + 1)
+			self.touch()
+
+	def _linesReset(self):
+		self.maxline = max(self.lines, default=0)
+		self.wrap = None
+		self._findReset()
+
+	def _findReset(self):
+		self.find_cache.clear()
+		self.find_dirty.clear()
+		self.find_pos = self.find_count = 0
+		self.find_hits.clear()
+		self.find_pending = None
+		if (self.find_re is not None): self.wakeup()
+		self.touch()
+
+	def _findSpans(self, ln: int) -> tuple[tuple[int, int]]:
+		try: return self.find_cache[ln]
+		except KeyError: pass
+
+		spans = tuple(m.span() for m in self.find_re.finditer(self.lines.get(ln, '')) if m.end() > m.start())
+		self.find_cache[ln] = spans
+		self.find_dirty.discard(ln)
+		self.find_count += len(spans)
+		if (spans):
+			bisect.insort(self.find_hits, ln)
+			self.found(ln, spans)
+		return spans
+
+	def _findScan(self) -> bool:
+		""" Scan the next `find_chunk' lines. Return: whether there are more. """
+
+		n = self.find_chunk
+		ln = self._wrapLayout().find(self.yoff)[0]
+		visible = range(ln, ln + self.height)
+
+		while (n > 0 and self.find_dirty):
+			ln = self.find_dirty.pop()
+			if (self._findSpans(ln) and ln in visible): self.touch()
+			n -= 1
+
+		if (n > 0 and self.lines):
+			nlines = self.nlines
+			while (n > 0 and self.find_pos <= nlines):
+				ln = self.find_pos
+				self.find_pos += 1
+				if (ln not in self.find_cache and self._findSpans(ln) and ln in visible): self.touch()
+				n -= 1
+
+		more = bool(self.find_dirty or self.find_pos <= self.nlines)
+
+		if ((pending := self.find_pending) is not None):
+			line, col, step, cursor = pending
+			if (cursor != (self.line, self.col)): self.find_pending = None  # moved meanwhile
+			elif ((pos := self._findLocate(line, col, step)) is not None):
+				self.find_pending = None
+				self._findGoto(*pos)
+			elif (not more): self.find_pending = None
+
+		return more
+
+	def _findFrom(self, line: int, col: int, step: int = +1) -> bool:
+		self.find_pending = None
+		if ((pos := self._findLocate(line, col, step)) is not None): return self._findGoto(*pos)
+
+		if (self.find_dirty or self.find_pos <= self.nlines):
+			self.find_pending = (line, col, step, (self.line, self.col))
+			self.wakeup()
+
+		return False
+
+	def _findLocate(self, line: int, col: int, step: int) -> (int, int) | None:
+		""" Nearest match from `(line, col)' forward (`step' > 0) or backward, wrapping around.
+		Only the current line is matched here; the others are looked up among the scanned lines.
+		Return: (line, col) of the match, or `None' if there is none or it may lie in a line not scanned yet.
+		"""
+
+		spans = [i for i in self._findSpans(line) if (i[0] >= col if (step > 0) else i[0] < col)]
+		if (spans): return (line, spans[0 if (step > 0) else -1][0])
+
+		hits, dirty, pos, nlines = self.find_hits, self.find_dirty, self.find_pos, self.nlines
+		if (step > 0):
+			i = bisect.bisect_right(hits, line)
+			if (i < len(hits)): ln = hits[i]; ok = (ln <= pos and not any(line < d < ln for d in dirty))
+			elif (hits): ln = hits[0]; ok = (pos > nlines and not any(d > line or d < ln for d in dirty))  # wrap around
+			else: return None
+			return ((ln, self.find_cache[ln][0][0]) if (ok) else None)
+		else:
+			i = bisect.bisect_left(hits, line)
+			if (i > 0): ln = hits[i-1]; ok = (line <= pos and not any(ln < d < line for d in dirty))
+			elif (hits): ln = hits[-1]; ok = (pos > nlines and not any(d < line or d > ln for d in dirty))  # wrap around
+			else: return None
+			return ((ln, self.find_cache[ln][-1][0]) if (ok) else None)
+
+	def _findInvalidate(self, ln: int):
+		spans = self.find_cache.pop(ln, None)
+		if (spans is not None):
+			self.find_count -= len(spans)
+			if (spans): del self.find_hits[bisect.bisect_left(self.find_hits, ln)]
+		if (self.find_re is not None):
+			self.find_dirty.add(ln)
+			self.wakeup()
+
+	def _findGoto(self, line: int, col: int) -> bool:
+		self.line, self.col = line, col
+		self.scrollToCursor()
+		self.touch()
+		return True
+
+	def _lineChanged(self, ln: int):
+		""" Invalidate caches for line `ln' after it was edited in place. """
+
+		self._findInvalidate(ln)
+		if (ln > self.maxline): self.maxline = ln
+
+		if ((wrap := self.wrap) is not None and ln >= 0):
+			while (len(wrap) <= ln):
+				self.wrap_adv.append(0)
+				wrap.append(self._lineRows('', 0))
+			l = self.lines.get(ln, '')
+			adv = self.wrap_adv[ln] = self._lineAdvance(l)
+			wrap[ln] = self._lineRows(l, adv)
+
+	def _linesMoved(self, ln: int, delta: int):
+		""" Renumber caches after lines past `ln' were shifted by `delta' (-1 means line `ln' was removed). """
+
+		if (delta < 0): self._findInvalidate(ln)
+		self.find_cache = {(k + delta if (k > ln) else k): v for k, v in self.find_cache.items()}
+		self.find_dirty = {(k + delta if (k > ln) else k) for k in self.find_dirty}
+		if (self.find_pos > ln): self.find_pos = max(ln, self.find_pos + delta)
+		self.find_hits = [(k + delta if (k > ln) else k) for k in self.find_hits]
+		if (ln <= self.maxline): self.maxline = max(self.maxline + delta, 0)
+
+		if ((wrap := self.wrap) is not None):
+			if (delta < 0):
+				if (len(wrap) <= 1): self.wrap = None
+				elif (ln < len(wrap)):
+					wrap.pop(ln)
+					self.wrap_adv.pop(ln)
+			elif (ln < len(wrap)):
+				wrap.insert(ln+1, self._lineRows('', 0))
+				self.wrap_adv.insert(ln+1, 0)
+
+	def _lineAdvance(self, l: str) -> int:
+		return (len(l) + l.count('\t')*(self.tabsize-1))
+
+	def _lineRows(self, l: str, adv: int) -> int:
+		""" Number of screen rows line `l' of display width `adv' takes in the current layout. """
+
+		width, x = self.wrap_width, self.wrap_gutter
+		if (width <= 0 or x + adv < width): return 1
+		if ('\t' not in l and x < width): return (1 + (x + adv) // width)
+
+		y = int()
+		for c in l:
+			x += (self.tabsize if (c == '\t') else 1)
+			if (x >= width): y += 1; x = 0
+		return (y + 1)
+
+	def _wrapLayout(self) -> SCFenwickTree:
+		""" Return the soft-wrap layout, updating it for the current width only where needed. """
+
+		width, gutter = max(self.width, 0), self.gutter
+
+		if (self.wrap is None):
+			self.wrap_width, self.wrap_gutter = width, gutter
+			lines = self.lines
+			self.wrap_adv = [self._lineAdvance(lines.get(ln, '')) for ln in range(self.maxline+1)]
+			self.wrap = SCFenwickTree(self._lineRows(lines.get(ln, ''), adv) for ln, adv in enumerate(self.wrap_adv))
+		elif (width != self.wrap_width or gutter != self.wrap_gutter):
+			ow, og = self.wrap_width, self.wrap_gutter
+			self.wrap_width, self.wrap_gutter = width, gutter
+			values = self.wrap.values
+			for ln, adv in enumerate(self.wrap_adv):
+				if (ow > 0 and og + adv < ow and gutter + adv < width): continue  # fits in both
+				values[ln] = self._lineRows(self.lines.get(ln, ''), adv)
+			self.wrap.rebuild()
+
+		return self.wrap
+
+	def _cursorRow(self) -> int:
+		""" Screen row of the cursor counted from the beginning of the text. """
+
+		wrap = self._wrapLayout()
+		if (self.line >= len(wrap)): return (wrap.total + self.line - len(wrap))
+
+		width, x, y = self.wrap_width, self.wrap_gutter, int()
+		if (width > 0):
+			for c in self.cline[:self.col]:
+				x += (self.tabsize if (c == '\t') else 1)
+				if (x >= width): y += 1; x = 0
+
+		return (wrap.prefix(self.line) + y)
+
 	@property
 	def text(self) -> str:
-		return '\n'.join(self.lines.get(i, '') for i in range(max(self.lines, default=0)+1))
+		return '\n'.join(self.lines.get(i, '') for i in range(self.maxline+1))
 
 	@text.setter
 	def text(self, s: str | list):
@@ -923,11 +3346,18 @@ class SCTextBox(SCView):
 		for ii, i in enumerate(s):
 			self.lines[ii] = i.rstrip('\n')
 		if (ii is not None and i.endswith('\n')): self.lines[ii+1] = ''
+		self._linesReset()
 
 	@property
 	def nlines(self) -> int:
 		#return max((k for k, v in self.lines.items() if v), default=0)
-		return max(self.lines, default=0)
+		return self.maxline
+
+	@property
+	def gutter(self) -> int:
+		""" Width of the decorations drawn before the first row of each line. """
+
+		return 0
 
 	@property
 	def cline(self) -> str:
@@ -936,6 +3366,7 @@ class SCTextBox(SCView):
 	@cline.setter
 	def cline(self, x: str):
 		self.lines[self.line] = x
+		self._lineChanged(self.line)
 
 	@cline.deleter
 	def cline(self):
@@ -945,17 +3376,24 @@ class SCTextBox(SCView):
 			if (ml is None): ml = ii
 			self.lines[ii-1] = i
 		self.lines.pop(ml if (ml is not None) else self.line, '')
+		self._linesMoved(self.line, -1)
 
 class SCLinedTextBox(SCTextBox):
+	# public:
+	gutter_attr: int | SCStyle = curses.A_DIM
+
 	def _drawLine(self, stdscr, ln: int, l: str, *, x: int = 0, y: int = 0):
-		lnw = len(S(max(self.lines, default=0)))
-		try: stdscr.addstr(y, x, str(ln+1).rjust(lnw), curses.A_DIM)
+		lnw = (self.gutter - 1)
+		try: stdscr.addstr(y, x, str(ln+1).rjust(lnw), int(self.gutter_attr))
 		except curses.error: pass
 		x += lnw+1
 		return super()._drawLine(stdscr, ln, l, x=x, y=y)
 
-if (__name__ == '__main__'): logstarted(); exit()
-else: logimported()
+	@property
+	def gutter(self) -> int:
+		return (len(str(self.nlines)) + 1)
+
+if (__name__ == '__main__'): _utils().logstarted(); exit()
 
 # by Sdore, 2019-22
 #   www.sdore.me
@@ -1,4 +1,57 @@
 __version__ = '2.0.0'
 
-from .Scurses import *
-del Scurses
+# The views are loaded on first access, so that `import Scurses' stays cheap
+# for tools that may never start a TUI, and loading them does not import the
+# `utils' toolkit either (see `benchmarks/importtime.py').
+
+__all__ = (
+	'MOUSE_WHEEL',
+	'SCFenwickTree',
+	'SCIntervalSet',
+	'SCWindow',
+	'SCApp',
+	'SCRecorder',
+	'SCReplay',
+	'SCCellWindow',
+	'SCTermWriter',
+	'SCLRUCache',
+	'SCColorPairs',
+	'SCStyle',
+	'SCKeyDecoder',
+	'SCSession',
+	'SCServer',
+	'SCChannel',
+	'SCWorkerPool',
+	'SCKey',
+	'SCViewBase',
+	'SCView',
+	'SCSlotsView',
+	'SCTestView',
+	'SCLabelView',
+	'SCWindowView',
+	'SCSplitView',
+	'SCVSplitView',
+	'SCHSplitView',
+	'SCObservableList',
+	'SCListView',
+	'SCLoadingListView',
+	'SCSelectingListView',
+	'SCLoadingSelectingListView',
+	'SCTreeView',
+	'SCTextBox',
+	'SCLinedTextBox',
+)
+
+def __getattr__(name):
+	if (name.startswith('__') or name == 'Scurses'): raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+	from . import Scurses as module
+	g = globals()
+	g.pop('Scurses', None)
+	g.update((k, getattr(module, k)) for k in __all__)
+
+	try: return getattr(module, name)
+	except AttributeError: raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+def __dir__():
+	return sorted({*globals(), *__all__})
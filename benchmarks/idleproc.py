@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+# Scurses idle scheduling benchmark
+
+""" Measure the cost of an idle main loop pass (`SCApp.proc()') over a
+tree of nested split views, and check that untouched views are not proc'd,
+polling views are, and a touched view is redrawn.
+
+Usage: python3 benchmarks/idleproc.py [depth] [passes]
+"""
+
+from __future__ import annotations
+
+import importlib, os, sys, time
+
+def load():
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	sys.path.insert(0, os.path.dirname(root))
+	return importlib.import_module(os.path.basename(root))
+
+def main(depth=8, passes=10000):
+	Scurses = load()
+
+	procs = polls = 0
+
+	class Leaf(Scurses.SCView):
+		def proc(self):
+			nonlocal procs
+			procs += 1
+
+	class Poller(Scurses.SCView):
+		poll = True
+
+		def proc(self):
+			nonlocal polls
+			polls += 1
+
+	leaves = list()
+
+	def tree(win, d):
+		if (not d): leaves.append(win.addView(Leaf())); return
+		split = win.addView(Scurses.SCHSplitView(0, 0))
+		for p in split.p: tree(p, d-1)
+
+	app = Scurses.SCApp()
+	app.stdscr = Scurses.SCCellWindow(24, 80)
+	app.newpad = Scurses.SCCellWindow
+	tree(app, depth)
+	leaves[-1].parent.addView(Poller())  # added before init, like the leaves
+	app.init()
+	app.proc()
+	app.draw()
+	polls = 0
+
+	start = time.perf_counter()
+	for _ in range(passes): app.proc()
+	idle = ((time.perf_counter() - start) / passes)
+	idle_procs, idle_polls = procs, polls
+
+	leaf = leaves[len(leaves)//2]
+	leaf.touch()
+	app.proc()
+	app.draw()
+	redrawn = (not leaf.touched)
+
+	print(f"{2**depth} leaves, depth {depth}: {idle*1e6:.2f} us/idle pass, {idle_procs} leaf procs, {idle_polls}/{passes} polling procs, touched leaf {'redrawn' if (redrawn) else 'NOT redrawn'}")
+	return (0 if (not idle_procs and idle_polls == passes and redrawn) else 1)
+
+if (__name__ == '__main__'): exit(main(*map(int, sys.argv[1:])))
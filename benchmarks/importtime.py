@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# Scurses import time budget check
+
+""" Check that `import Scurses' and the first access to a view stay within the startup budget.
+
+Runs `python -X importtime` in fresh interpreters, from an empty directory so
+that the package is imported and not the module of the same name inside it,
+and takes the best cumulative time of the package (the first run also warms up
+the bytecode cache). A bare import must not load `curses' or `utils', and
+loading the views (`Scurses.SCApp') must not load `utils' either.
+
+Usage: python3 benchmarks/importtime.py [budget_ms] [access_budget_ms]
+"""
+
+from __future__ import annotations
+
+import os, subprocess, sys, tempfile
+
+BUDGET_MS = 5.0
+ACCESS_BUDGET_MS = 30.0
+DEFERRED = ('utils', 'curses')
+ACCESS_DEFERRED = ('utils',)
+
+def importtime(name, path, code='') -> (int -- cumulative_us, set[str] -- modules):
+	env = dict(os.environ, PYTHONPATH=path)
+	with tempfile.TemporaryDirectory() as cwd:
+		p = subprocess.run((sys.executable, '-X', 'importtime', '-c', f"import {name}; {code}"), cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+	cumulative, modules = None, set()
+	for l in p.stderr.splitlines():
+		if (not l.startswith('import time:') or '|' not in l): continue
+		try: _, us, module = l.split('|')
+		except ValueError: continue
+		module = module.strip()
+		modules.add(module)
+		if (module in (name, f"{name}.Scurses")): cumulative = (cumulative or 0) + int(us)
+
+	return (cumulative, modules)
+
+def check(what, name, path, code, budget_ms, deferred, runs) -> bool:
+	best, modules = min((importtime(name, path, code) for _ in range(runs)), key=lambda x: x[0])
+	print(f"{what}: {best/1000:.2f} ms (budget {budget_ms:.2f} ms)")
+
+	ok = True
+	if (best > budget_ms*1000):
+		print("over budget", file=sys.stderr)
+		ok = False
+	for i in deferred:
+		if (i in modules):
+			print(f"{i!r} imported by {what}", file=sys.stderr)
+			ok = False
+
+	return ok
+
+def main(budget_ms=BUDGET_MS, access_budget_ms=ACCESS_BUDGET_MS, runs=5):
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	name, path = os.path.basename(root), os.path.dirname(root)
+
+	ok = check(f"import {name}", name, path, '', budget_ms, DEFERRED, runs)
+	ok &= check(f"first access to {name}.SCApp", name, path, f"{name}.SCApp", access_budget_ms, ACCESS_DEFERRED, runs)
+
+	return (0 if (ok) else 1)
+
+if (__name__ == '__main__'): exit(main(*map(float, sys.argv[1:])))
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+# Scurses batched list change benchmark
+
+""" Measure a batch of edits at both ends of a large `SCObservableList' shown
+by an `SCSelectingListView', and check that the highlighted, selected and
+multi-selected rows still point at the same items afterwards.
+
+Usage: python3 benchmarks/listbatch.py [rows] [edits]
+"""
+
+from __future__ import annotations
+
+import importlib, os, sys, time
+
+def load():
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	sys.path.insert(0, os.path.dirname(root))
+	return importlib.import_module(os.path.basename(root))
+
+def main(rows=100000, edits=100):
+	Scurses = load()
+
+	l = Scurses.SCObservableList(f"row {i}" for i in range(rows))
+	app = Scurses.SCApp()
+	app.stdscr = Scurses.SCCellWindow(24, 80)
+	app.newpad = Scurses.SCCellWindow
+	v = app.addView(Scurses.SCSelectingListView(l))
+	v.multiselect = True
+	app.init()
+	app.proc()
+	app.draw()
+
+	v.n = v.s = 50
+	v.selectRange(60, 65)
+	v.touch()
+	app.proc()
+	app.draw()
+	expected = (l[v.n], l[v.s], list(v.selected()))
+
+	start = time.perf_counter()
+	with v.batch():
+		for i in range(edits):
+			l.insert(0, f"top {i}")
+			l.append(f"bottom {i}")
+	app.proc()
+	app.draw()
+	took = (time.perf_counter() - start)
+
+	got = (l[v.n], l[v.s], list(v.selected()))
+	ok = (got == expected)
+	print(f"{rows} rows, {2*edits} edits in one batch: {took*1e3:.2f} ms, highlight and selection {'kept' if (ok) else f'moved: {got} != {expected}'}")
+	return (0 if (ok) else 1)
+
+if (__name__ == '__main__'): exit(main(*map(int, sys.argv[1:])))
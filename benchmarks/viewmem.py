@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# Scurses view memory benchmark
+
+""" Compare memory per label of a plain `SCView' and the slotted `SCLabelView',
+and check that popped views are freed right away, without the garbage collector.
+
+Usage: python3 benchmarks/viewmem.py [count]
+"""
+
+from __future__ import annotations
+
+import gc, importlib, os, sys, tracemalloc, weakref
+
+def load():
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	sys.path.insert(0, os.path.dirname(root))
+	return importlib.import_module(os.path.basename(root))
+
+def measure(factory, n) -> float:
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	views = [factory(i) for i in range(n)]
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del views
+	return ((after - before) / n)
+
+def main(n=10000):
+	Scurses = load()
+
+	class DictLabel(Scurses.SCView):
+		text: str
+		attr: int
+
+		def __init__(self, text):
+			super().__init__()
+			self.text = text
+
+	labels = (lambda i: DictLabel(f"row {i}"), lambda i: Scurses.SCLabelView(f"row {i}"))
+
+	for name, factory in zip(('SCView', 'SCLabelView'), labels):
+		print(f"{name}: {measure(factory, n):.0f} bytes/view")
+
+	gc.disable()
+	try:
+		win = Scurses.SCWindow()
+		refs = [weakref.ref(win.addView(factory(i))) for i in range(n) for factory in labels]
+		while (win.views): win.popView()
+		alive = sum(ref() is not None for ref in refs)
+
+		with Scurses.SCWindow() as win:
+			refs = [weakref.ref(win.addView(labels[1](i))) for i in range(n)]
+		del win
+		alive += sum(ref() is not None for ref in refs)
+	finally: gc.enable()
+
+	print(f"views left after teardown without gc: {alive}")
+	return (0 if (not alive) else 1)
+
+if (__name__ == '__main__'): exit(main(*map(int, sys.argv[1:])))